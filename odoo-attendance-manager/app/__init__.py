@@ -1,3 +1,11 @@
-from . import main
-from . import dashboard
-from . import utils
\ No newline at end of file
+import importlib
+
+# Submodules are imported on first attribute access so that ``import app.main``
+# does not pull in the dashboard and data-processing stacks at startup.
+_SUBMODULES = ("main", "dashboard", "utils")
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
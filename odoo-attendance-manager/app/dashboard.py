@@ -7,11 +7,14 @@ import os
 import json
 from datetime import datetime, timedelta
 import time
-import base64
-import io
 
-# Custom CSS
-st.markdown("""
+from app.utils.export import export_download_button
+from app.utils.downsampling import bucket_aggregate, bucket_counts
+from config import Config
+
+def apply_custom_css():
+    """Inject the dashboard CSS (called from main() so importing has no side effects)"""
+    st.markdown("""
     <style>
     .stDownloadButton button {
         width: 100%;
@@ -29,24 +32,7 @@ st.markdown("""
         margin: 10px 0;
     }
     </style>
-""", unsafe_allow_html=True)
-
-def get_csv_download_link(df, filename="data.csv"):
-    """Generate a download link for dataframe"""
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">Download CSV</a>'
-    return href
-
-def get_excel_download_link(df, filename="data.xlsx"):
-    """Generate a download link for Excel file"""
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
-    excel_data = output.getvalue()
-    b64 = base64.b64encode(excel_data).decode()
-    href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}">Download Excel</a>'
-    return href
+    """, unsafe_allow_html=True)
 
 def parse_logs():
     """Parse log files and return a DataFrame with enhanced error detection"""
@@ -97,9 +83,22 @@ def parse_logs():
     
     return pd.DataFrame(logs)
 
-def create_time_series(df, column, title):
-    """Create an interactive time series plot"""
-    fig = px.line(df, x='timestamp', y=column, title=title)
+def create_time_series(df, column, title, time_range=None):
+    """Create an interactive time series plot, downsampled to a bounded number of points"""
+    if len(df) <= Config.CHART_MAX_POINTS:
+        fig = px.line(df, x='timestamp', y=column, title=title)
+    else:
+        buckets = bucket_aggregate(df, column, time_range)
+        fig = go.Figure([
+            go.Scatter(x=buckets['timestamp'], y=buckets['max'], name='max',
+                       line=dict(width=0), showlegend=False),
+            go.Scatter(x=buckets['timestamp'], y=buckets['min'], name='min', fill='tonexty',
+                       line=dict(width=0), fillcolor='rgba(99, 110, 250, 0.2)', showlegend=False),
+            go.Scatter(x=buckets['timestamp'], y=buckets['mean'], name='mean', mode='lines'),
+            go.Scatter(x=buckets['timestamp'], y=buckets['p95'], name='p95', mode='lines',
+                       line=dict(dash='dot')),
+        ])
+        fig.update_layout(title=title)
     fig.update_layout(
         xaxis_title="Time",
         yaxis_title=column,
@@ -108,6 +107,7 @@ def create_time_series(df, column, title):
     return fig
 
 def main():
+    apply_custom_css()
     st.title("📊 Advanced Application Monitoring Dashboard")
     
     # Sidebar filters
@@ -153,9 +153,9 @@ def main():
         export_format = st.sidebar.selectbox("Export Format", ["CSV", "Excel"])
         if st.sidebar.button("Export Data"):
             if export_format == "CSV":
-                st.sidebar.markdown(get_csv_download_link(logs_df), unsafe_allow_html=True)
+                export_download_button("Download CSV", {"Logs": logs_df}, "csv", "logs.csv", container=st.sidebar)
             else:
-                st.sidebar.markdown(get_excel_download_link(logs_df), unsafe_allow_html=True)
+                export_download_button("Download Excel", {"Logs": logs_df}, "xlsx", "logs.xlsx", container=st.sidebar)
         
         # Main dashboard
         col1, col2, col3, col4 = st.columns(4)
@@ -178,15 +178,16 @@ def main():
         
         with tab1:
             # Error trend
-            error_trend = logs_df[logs_df['level'] == 'ERROR'].groupby(
-                logs_df['timestamp'].dt.floor('H')).size().reset_index()
-            error_trend.columns = ['timestamp', 'count']
+            error_trend = bucket_counts(logs_df[logs_df['level'] == 'ERROR'], time_ranges[selected_range])
             st.plotly_chart(create_time_series(error_trend, 'count', 'Error Trend'), use_container_width=True)
             
             # Operation duration trend
             duration_df = logs_df[pd.notnull(logs_df['duration'])]
             if not duration_df.empty:
-                st.plotly_chart(create_time_series(duration_df, 'duration', 'Operation Durations'), use_container_width=True)
+                st.plotly_chart(
+                    create_time_series(duration_df, 'duration', 'Operation Durations', time_ranges[selected_range]),
+                    use_container_width=True
+                )
         
         with tab2:
             col1, col2 = st.columns(2)
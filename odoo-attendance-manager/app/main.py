@@ -1,74 +1,393 @@
 import streamlit as st
-from . import dashboard
-from .utils.odoo_api import OdooAPI, get_config
-from .utils.data_processor import process_excel_file, visualize_attendance
 from dotenv import load_dotenv
 import os
-import pandas as pd
 from collections import defaultdict
-from io import BytesIO
-import time
+from datetime import date
 from .utils.auth import check_password, show_login_page
 
+# Heavy modules (pandas, matplotlib, openpyxl, requests) are imported inside the
+# functions and tabs that need them so the login page renders on a cold start.
+# Run ``python -m app.utils.startup`` to check for import-time regressions.
+
+# Number of report rows rendered in the browser; exports always contain every row
+REPORT_PREVIEW_ROWS = 1000
+
 def create_missing_employees(odoo, missing_employees):
-    """Create missing employees in Odoo with user input"""
-    success_count = 0
-    error_count = 0
-    error_details = defaultdict(list)
+    """Create missing employees in Odoo from a name table or mapping file"""
+    from .utils.provisioning import build_name_table, load_name_mapping, provision_employees
 
     st.subheader("Create Missing Employees")
-    st.write("Please provide names for the following employees:")
+    st.write(f"{len(missing_employees)} employees are missing. Edit their names below "
+             "or upload a badge → name mapping file (CSV or Excel).")
+
+    mapping_file = st.file_uploader(
+        "Badge to name mapping (optional)",
+        type=['csv', 'xls', 'xlsx'],
+        key="employee_mapping_file",
+        help="A file with a badge ID column and a name column"
+    )
+    mapping = {}
+    if mapping_file:
+        try:
+            mapping = load_name_mapping(mapping_file)
+            st.info(f"Loaded {len(mapping)} names from {mapping_file.name}")
+        except Exception as e:
+            st.error(f"❌ Could not read mapping file: {str(e)}")
 
     # Create a form for employee names
     with st.form("employee_creation_form"):
-        employee_names = {}
-        for badge_id in missing_employees:
-            default_name = f"Employee {badge_id}"
-            employee_names[badge_id] = st.text_input(
-                f"Name for Employee with Badge ID {badge_id}",
-                value=default_name,
-                key=f"emp_{badge_id}"
-            )
+        names_df = st.data_editor(
+            build_name_table(missing_employees, mapping),
+            disabled=["badge_id"],
+            hide_index=True,
+            use_container_width=True,
+            key="employee_names_editor"
+        )
         
         submit = st.form_submit_button("Create Employees")
         
         if submit:
-            progress_bar = st.progress(0)
-            for i, (badge_id, name) in enumerate(employee_names.items()):
-                try:
-                    odoo.create_employee(badge_id, name)
-                    success_count += 1
-                    st.success(f"✓ Created employee: {name} (Badge ID: {badge_id})")
-                except Exception as e:
-                    error_count += 1
-                    error_details[str(e)].append(badge_id)
-                    st.error(f"✗ Error creating employee with Badge ID {badge_id}: {str(e)}")
-                progress_bar.progress((i + 1) / len(employee_names))
+            with st.spinner(f"Creating {len(names_df)} employees..."):
+                report = provision_employees(odoo, dict(zip(names_df['badge_id'], names_df['name'])))
 
+            status_counts = report['status'].value_counts()
             # Print summary
             st.write("---")
             st.write("### Employee Creation Summary:")
-            st.write(f"Successfully created: {success_count} employees")
-            st.write(f"Failed to create: {error_count} employees")
+            st.write(f"Successfully created: {status_counts.get('created', 0)} employees")
+            st.write(f"Already existing: {status_counts.get('exists', 0)} employees")
+            st.write(f"Failed to create: {status_counts.get('failed', 0)} employees")
+            st.dataframe(report, hide_index=True)
             
-            if error_details:
+            failed = report[report['status'] == 'failed']
+            if not failed.empty:
                 st.write("### Error Details:")
-                for error, employees in error_details.items():
+                for error, badges in failed.groupby('error')['badge_id']:
                     st.error(f"Error: {error}")
-                    st.write("Affected Badge IDs:", ", ".join(map(str, employees)))
+                    st.write("Affected Badge IDs:", ", ".join(badges))
+            return report
 
-def process_with_progress(df):
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for i, row in enumerate(df.iterrows()):
-        status_text.text(f"Processing record {i+1} of {len(df)}")
-        progress_bar.progress((i + 1) / len(df))
-        # Process row
-        
-    status_text.text("✅ Processing complete!")
-    time.sleep(1)
-    status_text.empty()
+def get_attendance_index():
+    """Return the AttendanceIndex for the current attendance_df, rebuilding it when the data changes"""
+    from .utils.attendance_index import AttendanceIndex
+
+    index = st.session_state.get('attendance_index')
+    if index is None or not index.is_for(st.session_state.attendance_df):
+        index = AttendanceIndex(st.session_state.attendance_df)
+        st.session_state.attendance_index = index
+    return index
+
+@st.cache_resource
+def open_store(path):
+    """Shared local attendance store (one SQLite connection per database file)"""
+    from .utils.store import AttendanceStore
+
+    return AttendanceStore(path)
+
+def get_store():
+    """The attendance store of the selected company, or the default one"""
+    from config import Config
+
+    tenant_name = st.session_state.get('tenant_select')
+    if tenant_name:
+        return open_store(get_tenant_registry().get(tenant_name).attendance_db)
+    return open_store(Config.ATTENDANCE_DB)
+
+@st.cache_resource
+def get_tenant_registry():
+    """Tenants from TENANTS_FILE, shared by all sessions so each keeps one pool and cache"""
+    from .utils.tenants import TenantRegistry
+
+    return TenantRegistry.load()
+
+def import_attendance_file(source, source_name):
+    """Read, clean, store and pair an attendance export, and make it the current data"""
+    from .utils.cleaning import combine_exceptions, debounce_punches, flag_unpaired
+    from .utils.data_processor import pair_punches, read_punches
+
+    with st.spinner("Processing data..."):
+        punches = read_punches(source)
+        debounced, duplicates = debounce_punches(punches)
+        # Unpaired punches are still stored: a later export may complete the day
+        new_punches = get_store().import_punches(debounced, source=source_name)
+        clean, unpaired = flag_unpaired(debounced)
+        df = pair_punches(clean)
+    st.session_state.attendance_df = df
+    st.session_state.punch_exceptions = combine_exceptions(duplicates, unpaired)
+    st.session_state.pop('missing_employees', None)
+    st.session_state.pop('reconciliation', None)
+    st.success(f"✅ File processed successfully! {new_punches} new punches saved to history.")
+    st.write("Preview of the data:")
+    st.dataframe(df.head())
+
+def upload_attendance(odoo, attendance_df):
+    """Create Odoo attendances for the imported records and show a summary"""
+    with st.spinner("Uploading attendance records..."):
+        from .utils.progress import ProgressReporter
+        from .utils.profiling import stage
+
+        success_count = 0
+        error_count = 0
+        error_details = defaultdict(list)
+        unique_employees = attendance_df['employee_id'].unique()
+
+        with stage("resolve employees"), ProgressReporter(len(unique_employees), "Resolving employees") as reporter:
+            employee_ids = odoo.get_employee_ids(
+                unique_employees, on_batch=reporter.advance
+            )
+
+        with stage("upload"), ProgressReporter(len(attendance_df), "Uploading attendance records") as reporter:
+            from config import Config
+            from .utils.odoo_api import attendance_payloads
+
+            resolved = attendance_df['employee_id'].astype(str).map(employee_ids)
+            known = resolved.notna()
+            for badge_id in attendance_df.loc[~known, 'employee_id']:
+                error_count += 1
+                error_details[f"Employee with Badge ID {badge_id} not found in Odoo"].append(badge_id)
+            reporter.advance(int((~known).sum()))
+
+            # Format every record once, column-wise, then send them in batches
+            badges = attendance_df.loc[known, 'employee_id'].tolist()
+            values = attendance_payloads(
+                attendance_df.loc[known, ['check_in', 'check_out']].assign(employee_id=resolved[known])
+            )
+            batch_size = Config.UPLOAD_BATCH_SIZE
+            for start in range(0, len(values), batch_size):
+                batch = values[start:start + batch_size]
+                results = odoo.create_attendance_values_each(batch)
+                for badge_id, (_, error) in zip(badges[start:start + batch_size], results):
+                    if error:
+                        error_count += 1
+                        error_details[error].append(badge_id)
+                    else:
+                        success_count += 1
+                reporter.advance(len(batch))
+
+        st.write("### Upload Summary:")
+        st.write(f"Successfully uploaded: {success_count} records")
+        st.write(f"Failed to upload: {error_count} records")
+
+        if error_details:
+            st.write("### Error Details:")
+            for error, employees in error_details.items():
+                st.error(f"Error: {error}")
+                st.write("Affected employees:", ", ".join(map(str, employees)))
+
+        if success_count > 0:
+            st.success("✅ Data upload completed!")
+
+def upload_tenant_attendance(tenant, attendance_df):
+    """Upload through the company's employee cache, rate limit and fair scheduler"""
+    from .utils.tenants import MultiTenantSync
+
+    with st.spinner(f"Uploading attendance records to {tenant.name}..."):
+        jobs, unknown = tenant.attendance_jobs(attendance_df)
+        result = MultiTenantSync({tenant: jobs}).run()[tenant.name]
+
+    st.write("### Upload Summary:")
+    st.write(f"Successfully uploaded: {result.get('created', 0)} records")
+    st.write(f"Rejected by Odoo: {result.get('rejected', 0)} records")
+    if unknown:
+        st.error("Employees not found in Odoo: " + ", ".join(unknown))
+    for error in result["errors"]:
+        st.error(f"Error: {error}")
+    if result["deferred"]:
+        st.warning(f"{result['deferred']} upload batches were not sent because Odoo could not be reached")
+    if result.get('created', 0) > 0:
+        st.success("✅ Data upload completed!")
+
+def show_punch_exceptions():
+    """Show the punches the cleaning stage removed or could not pair"""
+    from .utils.cleaning import summarize_exceptions
+
+    exceptions = st.session_state.get('punch_exceptions')
+    if exceptions is None or exceptions.empty:
+        return
+    with st.expander(f"⚠️ Punch exceptions ({len(exceptions)})"):
+        st.write("These punches were collapsed as duplicates or could not be paired:")
+        st.dataframe(summarize_exceptions(exceptions), hide_index=True)
+        st.dataframe(exceptions.head(REPORT_PREVIEW_ROWS), hide_index=True)
+        st.download_button(
+            "Download Exceptions",
+            data=exceptions.to_csv(index=False).encode('utf-8'),
+            file_name="punch_exceptions.csv",
+            mime="text/csv"
+        )
+
+def attendance_source(key):
+    """Choose between the last import and the stored history
+
+    Returns (employees, first day, last day, loader) where ``loader(employees,
+    start, end)`` returns an AttendanceIndex, or None when there is no data.
+    """
+    from .utils.attendance_index import AttendanceIndex
+
+    store = get_store()
+    sources = []
+    if 'attendance_df' in st.session_state:
+        sources.append("Last import")
+    if store.has_data():
+        sources.append("Stored history")
+    if not sources:
+        return None
+
+    source = sources[0]
+    if len(sources) > 1:
+        source = st.radio("Data source", sources, horizontal=True, key=f"{key}_source")
+
+    if source == "Stored history":
+        first_day, last_day = store.date_bounds()
+
+        def load(employees=None, start=None, end=None):
+            return AttendanceIndex(store.query_attendance(employees, start, end))
+
+        return store.employees(), first_day, last_day, load
+
+    index = get_attendance_index()
+    return index.employees, index.date_min, index.date_max, index.filter
+
+def show_odoo_analytics(odoo):
+    """Attendance analytics aggregated by Odoo with read_group"""
+    import pandas as pd
+    from datetime import timedelta
+
+    col1, col2 = st.columns(2)
+    with col1:
+        period = st.date_input(
+            "Period",
+            value=(date.today() - timedelta(days=30), date.today()),
+            key="analytics_period"
+        )
+    with col2:
+        interval = st.selectbox("Group hours by", ["day", "week", "month"], key="analytics_interval")
+
+    if st.button("Run Analysis"):
+        date_from = period[0] if len(period) > 0 else None
+        date_to = period[1] if len(period) > 1 else None
+        try:
+            with st.spinner("Aggregating attendance in Odoo..."):
+                st.session_state.odoo_analytics = {
+                    "interval": interval,
+                    "hours": pd.DataFrame(odoo.get_attendance_hours(interval, date_from, date_to)),
+                    "departments": pd.DataFrame(odoo.get_attendance_counts_by_department(date_from, date_to)),
+                }
+        except Exception as e:
+            st.error(f"❌ Error running analysis: {str(e)}")
+
+    analytics = st.session_state.get('odoo_analytics')
+    if not analytics:
+        return
+
+    hours = analytics["hours"]
+    if hours.empty:
+        st.info("No attendance found in Odoo for this period")
+        return
+
+    st.subheader(f"Hours per Employee per {analytics['interval'].title()}")
+    hours_by_period = hours.pivot_table(
+        index="employee", columns="period", values="hours", aggfunc="sum", sort=False
+    ).round(2)
+    st.dataframe(hours_by_period)
+    st.bar_chart(hours.groupby("period", sort=False)["hours"].sum())
+
+    departments = analytics["departments"]
+    if not departments.empty:
+        st.subheader("Attendance by Department")
+        st.dataframe(departments.round(2), hide_index=True)
+        st.bar_chart(departments.set_index("department")["attendances"])
+
+def show_reconciliation(odoo):
+    """Pull attendance edited in Odoo and compare it with the device data"""
+    from .utils.reconcile import WATERMARK_KEY, pull_odoo_changes, reconcile, summarize_reconciliation
+
+    st.subheader("Reconciliation")
+    store = get_store()
+    watermark = store.get_sync_value(WATERMARK_KEY)
+    st.caption(f"Last pulled changes up to: {watermark}" if watermark else "No changes pulled from Odoo yet.")
+
+    compare = False
+    if st.button("Pull Changes from Odoo"):
+        try:
+            with st.spinner("Pulling changed attendance from Odoo..."):
+                pulled = pull_odoo_changes(odoo, store)
+            st.success(f"✅ Pulled {pulled} changed attendance records")
+            watermark = store.get_sync_value(WATERMARK_KEY)
+            compare = True
+        except Exception as e:
+            st.error(f"❌ Error pulling changes: {str(e)}")
+
+    first_day, last_day = store.date_bounds()
+    if first_day is None:
+        st.info("👆 Import device data first to compare it with Odoo")
+        return
+    period = st.date_input("Compare Period", value=(first_day, last_day), key="reconcile_period")
+    start = period[0] if len(period) > 0 else None
+    end = period[1] if len(period) > 1 else None
+
+    # The diff reads both tables in full, so it only runs on request and is
+    # reused across reruns until the watermark or the period changes
+    cache_key = (store.path, watermark, start, end)
+    compare = st.button("Compare with Device Data") or compare
+    cached = st.session_state.get('reconciliation')
+    if compare:
+        with st.spinner("Comparing..."):
+            cached = (cache_key, reconcile(store, start=start, end=end))
+        st.session_state['reconciliation'] = cached
+    if cached is None or cached[0] != cache_key:
+        st.info("Press Compare to diff the device data for this period against the pulled Odoo records.")
+        return
+    diff = cached[1]
+    st.dataframe(summarize_reconciliation(diff), hide_index=True)
+    statuses = st.multiselect(
+        "Show",
+        ["changed_in_odoo", "missing_in_odoo", "only_in_odoo", "match"],
+        default=["changed_in_odoo", "missing_in_odoo", "only_in_odoo"]
+    )
+    differences = diff[diff['status'].isin(statuses)]
+    st.dataframe(differences.head(REPORT_PREVIEW_ROWS), hide_index=True)
+    if st.button("Export Reconciliation"):
+        from .utils.export import export_download_button
+
+        export_download_button("Download Reconciliation", {"Reconciliation": differences}, "xlsx", "reconciliation.xlsx")
+
+def show_performance_page():
+    """Per-stage timings and hot functions of the last profiled runs"""
+    import pandas as pd
+    from .utils.profiling import recent_profiles
+
+    st.header("Performance")
+    profiles = recent_profiles()
+    if not profiles:
+        st.info("No profiles recorded yet. Interact with the app and come back.")
+        return
+
+    st.subheader("Recent Runs")
+    st.dataframe(pd.DataFrame([{
+        "run": profile.name,
+        "started": profile.started_at,
+        "seconds": round(profile.duration, 3),
+        "stages": len(profile.stages),
+    } for profile in profiles]), hide_index=True)
+
+    labels = [f"{profile.started_at:%H:%M:%S} · {profile.name} · {profile.duration:.2f}s" for profile in profiles]
+    selected = profiles[st.selectbox("Profile", range(len(profiles)), format_func=labels.__getitem__)]
+
+    st.subheader("Time per Stage")
+    totals = selected.stage_totals()
+    other = max(selected.duration - sum(seconds for _, seconds in totals), 0.0)
+    breakdown = pd.DataFrame(totals + [("(other)", other)], columns=["stage", "seconds"])
+    st.bar_chart(breakdown.set_index("stage"))
+    if selected.stages:
+        st.dataframe(
+            pd.DataFrame(selected.stages)
+            .groupby(["depth", "stage"])["seconds"]
+            .agg(["count", "sum", "max"])
+            .round(4),
+        )
+
+    st.subheader("Hot Functions")
+    st.dataframe(pd.DataFrame(selected.functions).round(4), hide_index=True)
 
 def run_app():
     # Load environment variables if running locally
@@ -81,6 +400,8 @@ def run_app():
             st.rerun()
         return
 
+    from .utils.odoo_api import OdooAPI, get_config
+
     st.title("My Odoo Attendance Manager")
     
     with st.sidebar:
@@ -92,39 +413,64 @@ def run_app():
             st.rerun()
         
         st.subheader("Odoo Connection")
+        tenant = None
+        tenant_registry = get_tenant_registry()
+        if tenant_registry:
+            tenant = tenant_registry.get(st.selectbox(
+                "Company",
+                tenant_registry.names(),
+                key="tenant_select",
+                help="Each company syncs with its own Odoo database"
+            ))
+            if st.session_state.get('tenant') != tenant.name:
+                st.session_state.pop('odoo', None)
+
         with st.expander("Connection Details", expanded=True):
-            st.info("These settings are pre-filled from your configuration. Edit only if needed.")
-            url = st.text_input(
-                "Odoo URL", 
-                value=get_config("ODOO_URL"),
-                help="The URL of your Odoo instance"
-            )
-            db = st.text_input(
-                "Database", 
-                value=get_config("ODOO_DB"),
-                help="Your Odoo database name"
-            )
-            username = st.text_input(
-                "Username", 
-                value=get_config("ODOO_USERNAME"),
-                help="Your Odoo login email"
-            )
-            password = st.text_input(
-                "Password", 
-                value=get_config("ODOO_PASSWORD"),
-                type="password",
-                help="Your Odoo password"
-            )
-            api_key = st.text_input(
-                "API Key", 
-                value=get_config("api_key"),
-                type="password",
-                help="Your Odoo API key for authentication"
-            )
+            if tenant:
+                st.info(f"Using the connection configured for {tenant.name}.")
+                url, db, username = tenant.url, tenant.db, tenant.username
+                st.text_input("Odoo URL", value=url, disabled=True)
+                st.text_input("Database", value=db, disabled=True)
+                st.text_input("Username", value=username, disabled=True)
+            else:
+                st.info("These settings are pre-filled from your configuration. Edit only if needed.")
+                url = st.text_input(
+                    "Odoo URL", 
+                    value=get_config("ODOO_URL"),
+                    help="The URL of your Odoo instance"
+                )
+                db = st.text_input(
+                    "Database", 
+                    value=get_config("ODOO_DB"),
+                    help="Your Odoo database name"
+                )
+                username = st.text_input(
+                    "Username", 
+                    value=get_config("ODOO_USERNAME"),
+                    help="Your Odoo login email"
+                )
+                password = st.text_input(
+                    "Password", 
+                    value=get_config("ODOO_PASSWORD"),
+                    type="password",
+                    help="Your Odoo password"
+                )
+                api_key = st.text_input(
+                    "API Key", 
+                    value=get_config("api_key"),
+                    type="password",
+                    help="Your Odoo API key for authentication"
+                )
         
         if st.button("Connect to Odoo", help="Test connection to Odoo with provided credentials"):
             try:
-                odoo = OdooAPI()
+                if tenant:
+                    odoo = tenant.odoo
+                    st.session_state['tenant'] = tenant.name
+                else:
+                    odoo = OdooAPI(url=url, db=db, username=username, password=password, api_key=api_key)
+                # Reuses a cached session when it is still valid, otherwise logs in
+                odoo.ensure_session(force_check=True)
                 st.session_state['odoo'] = odoo
                 st.success("✅ Connected successfully!")
                 
@@ -144,16 +490,15 @@ def run_app():
                         employees = odoo.get_all_employees()
                         total_employees = len(employees) if employees else 0
                         
-                        # Get recent attendance records
-                        recent_attendance = odoo.get_recent_attendance()
-                        total_attendance = len(recent_attendance) if recent_attendance else 0
+                        # Count attendance records on the server
+                        total_attendance = odoo.count_attendance() or 0
                         
                         st.write("### System Statistics")
                         col1, col2 = st.columns(2)
                         with col1:
                             st.metric("Total Employees", total_employees)
                         with col2:
-                            st.metric("Recent Attendance Records", total_attendance)
+                            st.metric("Attendance Records", total_attendance)
                             
                     except Exception as e:
                         st.warning("Could not fetch all statistics. Some features might be limited.")
@@ -167,7 +512,7 @@ def run_app():
     
     # Add error handling
     try:
-        if not get_config("ODOO_URL"):
+        if not get_config("ODOO_URL") and not tenant_registry:
             status_container.error("⚠️ Configuration not found. Please check your settings.")
             return
         
@@ -192,17 +537,20 @@ def run_app():
                 avg_hours = st.session_state.attendance_df['total_hours'].mean()
                 st.metric("Avg Hours/Day", f"{avg_hours:.2f}")
         with col3:
-            total_attendance = len(st.session_state.odoo.get_recent_attendance())
-            st.metric("Recent Attendance Records", total_attendance)
+            total_attendance = st.session_state.odoo.count_attendance()
+            st.metric("Attendance Records in Odoo", total_attendance)
         with col4:
             if 'attendance_df' in st.session_state:
-                present_today = len(st.session_state.attendance_df[
-                    st.session_state.attendance_df['date'] == pd.Timestamp.now().date()
-                ])
+                present_today = len(get_attendance_index().filter(start=date.today(), end=date.today()))
                 st.metric("Present Today", present_today)
     
     # Main content area
-    tab1, tab2, tab3 = st.tabs(["Data Import", "Dashboard", "Reports"])
+    from .utils.profiling import profiling_enabled
+
+    tab_names = ["Data Import", "Dashboard", "Reports", "Odoo Analytics"]
+    if profiling_enabled():
+        tab_names.append("Performance")
+    tab1, tab2, tab3, tab4, *extra_tabs = st.tabs(tab_names)
     
     with tab1:
         st.header("Import Attendance Data")
@@ -211,7 +559,7 @@ def run_app():
         st.subheader("Upload Attendance File")
         with st.expander("File Requirements", expanded=True):
             st.info("""
-            The Excel file should contain the following columns:
+            The file (Excel, CSV, Parquet or Arrow) should contain the following columns:
             - AC-No.: Employee badge/ID number
             - Time: Date and time of check-in/out
             - State: 'C/In' for check-in, 'C/Out' for check-out
@@ -225,161 +573,164 @@ def run_app():
             
             if upload_method == "Upload File":
                 uploaded_file = st.file_uploader(
-                    "Choose an Excel file", 
-                    type=['xls', 'xlsx'],
-                    help="Upload your attendance Excel file"
+                    "Choose an attendance file", 
+                    type=['xls', 'xlsx', 'csv', 'txt', 'parquet', 'arrow', 'feather'],
+                    help="Upload your attendance export; the format is detected automatically"
                 )
                 if uploaded_file:
                     if st.button("Process Uploaded File"):
-                        with st.spinner("Processing data..."):
-                            df = process_excel_file(uploaded_file)
-                            if df is not None:
-                                st.session_state.attendance_df = df
-                                st.success("✅ File processed successfully!")
-                                st.write("Preview of the data:")
-                                st.dataframe(df.head())
+                        import_attendance_file(uploaded_file, uploaded_file.name)
             else:
-                default_path = "/home/sabry/yarab/data/acnLog12.xls"
+                from config import Config
+                default_path = Config.DEFAULT_ATTENDANCE_FILE
                 st.text_input("Default file path", value=default_path, disabled=True)
                 if st.button("Process Default File"):
                     if os.path.exists(default_path):
-                        with st.spinner("Processing data..."):
-                            df = process_excel_file(default_path)
-                            if df is not None:
-                                st.session_state.attendance_df = df
-                                st.success("✅ File processed successfully!")
-                                st.write("Preview of the data:")
-                                st.dataframe(df.head())
+                        import_attendance_file(default_path, os.path.basename(default_path))
                     else:
                         st.error(f"❌ File not found at: {default_path}")
             
+            show_punch_exceptions()
+
             if 'attendance_df' in st.session_state and 'odoo' in st.session_state:
                 st.subheader("Upload to Odoo")
                 if st.button("Upload Processed Data to Odoo"):
                     try:
                         with st.spinner("Checking employees..."):
                             unique_employees = st.session_state.attendance_df['employee_id'].unique()
-                            missing, existing = st.session_state.odoo.check_missing_employees(unique_employees)
-                            
-                            if missing:
-                                st.warning("⚠️ The following employees need to be created in Odoo first:")
-                                st.write("Missing Employee IDs:", missing)
-                                
-                                create_missing_employees(st.session_state.odoo, missing)
-                                
-                                # Recheck for missing employees
-                                missing, existing = st.session_state.odoo.check_missing_employees(unique_employees)
-                                if missing:
-                                    st.error("Some employees could not be created. Please check the errors above.")
-                                    return
-                            
-                            # If no missing employees (or all were created), proceed with upload
-                            with st.spinner("Uploading attendance records..."):
-                                success_count = 0
-                                error_count = 0
-                                error_details = defaultdict(list)
-                                
-                                progress_bar = st.progress(0)
-                                for index, row in st.session_state.attendance_df.iterrows():
-                                    try:
-                                        employee_id = st.session_state.odoo.get_employee_id(row['employee_id'])
-                                        st.session_state.odoo.create_attendance(
-                                            employee_id=employee_id,
-                                            check_in=row['check_in'],
-                                            check_out=row['check_out']
-                                        )
-                                        success_count += 1
-                                    except Exception as e:
-                                        error_count += 1
-                                        error_details[str(e)].append(row['employee_id'])
-                                    progress_bar.progress((index + 1) / len(st.session_state.attendance_df))
-
-                                st.write("### Upload Summary:")
-                                st.write(f"Successfully uploaded: {success_count} records")
-                                st.write(f"Failed to upload: {error_count} records")
-                                
-                                if error_details:
-                                    st.write("### Error Details:")
-                                    for error, employees in error_details.items():
-                                        st.error(f"Error: {error}")
-                                        st.write("Affected employees:", ", ".join(map(str, employees)))
-                                
-                                if success_count > 0:
-                                    st.success("✅ Data upload completed!")
-                                
+                            missing, _ = st.session_state.odoo.check_missing_employees(unique_employees)
+                        if missing:
+                            # Kept across reruns so the provisioning form below stays up
+                            st.session_state['missing_employees'] = missing
+                        else:
+                            st.session_state.pop('missing_employees', None)
+                            if tenant and st.session_state.get('tenant') == tenant.name:
+                                upload_tenant_attendance(tenant, st.session_state.attendance_df)
+                            else:
+                                upload_attendance(st.session_state.odoo, st.session_state.attendance_df)
                     except Exception as e:
                         st.error(f"❌ Error during upload: {str(e)}")
+
+                missing = st.session_state.get('missing_employees')
+                if missing:
+                    st.warning("⚠️ The following employees need to be created in Odoo first:")
+                    st.write("Missing Employee IDs:", missing)
+                    report = create_missing_employees(st.session_state.odoo, missing)
+                    if report is not None:
+                        failed = report.loc[report['status'] == 'failed', 'badge_id'].tolist()
+                        if failed:
+                            st.session_state['missing_employees'] = failed
+                            st.error("Some employees could not be created. Please check the errors above.")
+                        else:
+                            st.session_state.pop('missing_employees', None)
+                            st.success("✅ All employees exist in Odoo now. Upload the data again.")
     
     with tab2:
         st.header("Attendance Dashboard")
-        if 'attendance_df' in st.session_state:
+        source = attendance_source("dashboard")
+        if source:
+            employees, first_day, last_day, load_attendance = source
+
             # Add filters
             col1, col2 = st.columns(2)
             with col1:
                 selected_employees = st.multiselect(
                     "Select Employees",
-                    options=st.session_state.attendance_df['employee_id'].unique()
+                    options=employees
                 )
             with col2:
                 date_range = st.date_input(
                     "Select Date Range",
-                    value=(
-                        st.session_state.attendance_df['date'].min(),
-                        st.session_state.attendance_df['date'].max()
-                    )
+                    value=(first_day, last_day)
                 )
             
             # Filter data based on selection
-            filtered_df = st.session_state.attendance_df.copy()
-            if selected_employees:
-                filtered_df = filtered_df[filtered_df['employee_id'].isin(selected_employees)]
-            if date_range:
-                filtered_df = filtered_df[
-                    (filtered_df['date'] >= date_range[0]) & 
-                    (filtered_df['date'] <= date_range[1])
-                ]
+            filtered = load_attendance(
+                employees=selected_employees,
+                start=date_range[0] if len(date_range) > 0 else None,
+                end=date_range[1] if len(date_range) > 1 else None
+            )
             
-            visualize_attendance(filtered_df)
+            from .utils.data_processor import visualize_attendance
+            visualize_attendance(filtered)
         else:
             st.info("👆 Please import attendance data first")
     
     with tab3:
         st.header("Attendance Reports")
-        if 'attendance_df' in st.session_state:
-            report_type = st.selectbox(
-                "Select Report Type",
-                ["Daily Summary", "Employee Summary", "Late Arrivals", "Early Departures"]
-            )
-            
-            if report_type == "Daily Summary":
-                daily_summary = st.session_state.attendance_df.groupby('date').agg({
-                    'employee_id': 'count',
-                    'total_hours': ['mean', 'min', 'max']
-                }).round(2)
-                st.dataframe(daily_summary)
+        source = attendance_source("reports")
+        if source:
+            from .utils.reports import REPORT_TYPES, build_report
+            from .utils.export import export_download_button
+
+            _, first_day, last_day, load_attendance = source
+            col1, col2 = st.columns(2)
+            with col1:
+                report_type = st.selectbox("Select Report Type", REPORT_TYPES)
+            with col2:
+                report_range = st.date_input(
+                    "Report Period",
+                    value=(first_day, last_day),
+                    key="report_range"
+                )
+            report_options = {}
+            if report_type == "Payroll Summary":
+                from config import Config
+                from .utils.rules import PAY_PERIODS
+
+                report_options["pay_period"] = st.selectbox(
+                    "Pay Period",
+                    PAY_PERIODS,
+                    index=PAY_PERIODS.index(Config.PAY_PERIOD) if Config.PAY_PERIOD in PAY_PERIODS else 0
+                )
+            report_data = load_attendance(
+                start=report_range[0] if len(report_range) > 0 else None,
+                end=report_range[1] if len(report_range) > 1 else None
+            ).df
+            report_df = build_report(report_data, report_type, **report_options)
+            st.dataframe(report_df.head(REPORT_PREVIEW_ROWS))
+            if len(report_df) > REPORT_PREVIEW_ROWS:
+                st.caption(f"Showing the first {REPORT_PREVIEW_ROWS} of {len(report_df)} rows. Export to get all rows.")
             
             # Add export buttons
-            col1, col2 = st.columns(2)
+            file_stem = "attendance_" + report_type.lower().replace(" ", "_")
+            col1, col2, col3 = st.columns(3)
             with col1:
                 if st.button("Export to Excel"):
-                    # Create Excel file
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        daily_summary.to_excel(writer, sheet_name='Daily Summary')
-                    st.download_button(
+                    export_download_button(
                         "Download Excel Report",
-                        data=output.getvalue(),
-                        file_name="attendance_report.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        {report_type: report_df},
+                        "xlsx",
+                        f"{file_stem}.xlsx"
                     )
             with col2:
                 if st.button("Export to CSV"):
-                    csv = daily_summary.to_csv().encode('utf-8')
-                    st.download_button(
+                    export_download_button(
                         "Download CSV Report",
-                        data=csv,
-                        file_name="attendance_report.csv",
-                        mime="text/csv"
+                        {report_type: report_df},
+                        "csv",
+                        f"{file_stem}.csv"
+                    )
+            with col3:
+                if st.button("Export All Reports"):
+                    export_download_button(
+                        "Download All Reports",
+                        {name: build_report(report_data, name) for name in REPORT_TYPES},
+                        "xlsx",
+                        "attendance_reports.xlsx"
                     )
         else:
             st.info("👆 Please import attendance data first")
+    
+    with tab4:
+        st.header("Odoo Attendance Analytics")
+        if 'odoo' in st.session_state:
+            show_odoo_analytics(st.session_state.odoo)
+            st.divider()
+            show_reconciliation(st.session_state.odoo)
+        else:
+            st.info("👈 Please connect to Odoo first")
+    
+    if extra_tabs:
+        with extra_tabs[0]:
+            show_performance_page()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+
+def _to_day(value):
+    return None if value is None else np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class AttendanceIndex:
+    """Attendance records sorted by (employee, date) for fast filtering
+
+    Rows are kept in (employee_id, date) order with an offset table giving each
+    employee's contiguous row range, plus a date-sorted permutation of the rows.
+    Employee/date-range filters are answered with binary search and slicing
+    instead of scanning the whole frame.
+    """
+
+    def __init__(self, attendance_df):
+        self.source = attendance_df
+        if attendance_df.empty:
+            self._build(attendance_df.reset_index(drop=True), np.array([], dtype='datetime64[D]'))
+            return
+        employees = attendance_df['employee_id'].astype(str).to_numpy()
+        dates = pd.to_datetime(attendance_df['date']).to_numpy().astype('datetime64[D]')
+        order = np.lexsort((dates, employees))
+        self._build(attendance_df.iloc[order].reset_index(drop=True), dates[order])
+
+    @classmethod
+    def _from_sorted(cls, df, dates, source):
+        index = cls.__new__(cls)
+        index.source = source
+        index._build(df, dates)
+        return index
+
+    def _build(self, df, dates):
+        self.df = df
+        self._dates = dates
+        employees = df['employee_id'].astype(str).to_numpy() if len(df) else np.array([], dtype=object)
+        boundaries = np.flatnonzero(employees[1:] != employees[:-1]) + 1
+        starts = np.concatenate(([0], boundaries)) if len(df) else np.array([], dtype=int)
+        stops = np.concatenate((boundaries, [len(df)])) if len(df) else np.array([], dtype=int)
+        self._offsets = {employees[start]: (start, stop) for start, stop in zip(starts, stops)}
+        self._date_order = np.argsort(dates, kind='stable')
+        self._sorted_dates = dates[self._date_order]
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    @property
+    def employees(self):
+        return list(self._offsets)
+
+    @property
+    def date_min(self):
+        return pd.Timestamp(self._sorted_dates[0]).date() if len(self) else None
+
+    @property
+    def date_max(self):
+        return pd.Timestamp(self._sorted_dates[-1]).date() if len(self) else None
+
+    def is_for(self, attendance_df):
+        """True when this index was built from the given frame"""
+        return self.source is attendance_df
+
+    def _positions(self, employees=None, start=None, end=None):
+        """Row positions (in index order) matching the employee/date filter"""
+        start, end = _to_day(start), _to_day(end)
+        if employees:
+            ranges = []
+            for employee in employees:
+                if str(employee) not in self._offsets:
+                    continue
+                lo, hi = self._offsets[str(employee)]
+                dates = self._dates[lo:hi]
+                first = lo + (0 if start is None else np.searchsorted(dates, start, 'left'))
+                last = lo + (len(dates) if end is None else np.searchsorted(dates, end, 'right'))
+                if first < last:
+                    ranges.append(np.arange(first, last))
+            return np.sort(np.concatenate(ranges)) if ranges else np.array([], dtype=int)
+
+        if start is None and end is None:
+            return None
+        lo = 0 if start is None else np.searchsorted(self._sorted_dates, start, 'left')
+        hi = len(self) if end is None else np.searchsorted(self._sorted_dates, end, 'right')
+        return np.sort(self._date_order[lo:hi])
+
+    def filter(self, employees=None, start=None, end=None):
+        """Return an AttendanceIndex over the rows matching the filter"""
+        positions = self._positions(employees, start, end)
+        if positions is None:
+            return self
+        return AttendanceIndex._from_sorted(
+            self.df.take(positions).reset_index(drop=True),
+            self._dates[positions],
+            self.source
+        )
+
+    def employee_frame(self, employee):
+        """All rows of one employee, in date order"""
+        lo, hi = self._offsets.get(str(employee), (0, 0))
+        return self.df.iloc[lo:hi]
+
+    def iter_employees(self):
+        """Yield (employee_id, rows) for each employee without boolean masks"""
+        for employee, (lo, hi) in self._offsets.items():
+            yield employee, self.df.iloc[lo:hi]
@@ -0,0 +1,97 @@
+import pandas as pd
+
+from config import Config
+from .profiling import stage
+
+VALID_STATES = ['C/In', 'C/Out']
+
+EXCEPTION_REASONS = {
+    'duplicate': "Repeated punch within the debounce window",
+    'unknown_state': "State is neither C/In nor C/Out",
+    'orphan_check_in': "C/In without a C/Out on the same day",
+    'orphan_check_out': "C/Out without a C/In on the same day",
+    'out_of_order': "Last C/Out is not after the first C/In",
+}
+
+
+def _exceptions(df, reason):
+    return df.assign(reason=reason, detail=EXCEPTION_REASONS[reason])
+
+
+@stage("clean: debounce")
+def debounce_punches(punches, window_seconds=None):
+    """Collapse repeated punches of the same employee and state inside the window
+
+    Returns (kept punches sorted by employee and time, exceptions). Consecutive
+    punches of one employee with the same state on the same day form a run.
+    The earliest C/In and the latest C/Out of a run are kept, since those are
+    the ones pairing uses. Other punches of the run within ``window_seconds``
+    of the kept one are repeats.
+    """
+    window = pd.Timedelta(seconds=Config.PUNCH_DEBOUNCE_SECONDS if window_seconds is None else window_seconds)
+    df = punches.sort_values(['AC-No.', 'Time'], kind='stable').reset_index(drop=True)
+    states = df['State'].astype(str)
+
+    unknown = ~states.isin(VALID_STATES)
+    same_run = (
+        (df['AC-No.'] == df['AC-No.'].shift())
+        & (df['Date'] == df['Date'].shift())
+        & (states == states.shift())
+        & (df['Time'].diff() <= window)
+    )
+    run = (~same_run).cumsum()
+    is_in = states == 'C/In'
+    # Measure from the punch that is kept, not from the previous punch, so a
+    # long chain of repeats cannot move the kept time by more than the window
+    kept_time = df['Time'].groupby(run).transform('min').where(is_in, df['Time'].groupby(run).transform('max'))
+    kept = df.index.to_series().groupby(run).transform('first').where(is_in, df.index.to_series().groupby(run).transform('last'))
+    duplicate = (df.index != kept) & ((df['Time'] - kept_time).abs() <= window) & ~unknown
+
+    exceptions = pd.concat([
+        _exceptions(df[duplicate], 'duplicate'),
+        _exceptions(df[unknown], 'unknown_state'),
+    ])
+    return df[~duplicate & ~unknown].reset_index(drop=True), exceptions
+
+
+@stage("clean: unpaired days")
+def flag_unpaired(punches):
+    """Split out punches of days that cannot be paired
+
+    Returns (pairable punches, exceptions) where exceptions are the punches of
+    days with only C/In, only C/Out, or whose last C/Out is not after the
+    first C/In.
+    """
+    days = [punches['AC-No.'], punches['Date']]
+    is_in = punches['State'].astype(str) == 'C/In'
+    first_in = punches['Time'].where(is_in).groupby(days).transform('min')
+    last_out = punches['Time'].where(~is_in).groupby(days).transform('max')
+
+    orphan_in = last_out.isna()
+    orphan_out = first_in.isna()
+    out_of_order = ~orphan_in & ~orphan_out & (last_out <= first_in)
+
+    exceptions = pd.concat([
+        _exceptions(punches[orphan_in & ~orphan_out], 'orphan_check_in'),
+        _exceptions(punches[orphan_out & ~orphan_in], 'orphan_check_out'),
+        _exceptions(punches[out_of_order], 'out_of_order'),
+    ])
+    return punches[~orphan_in & ~orphan_out & ~out_of_order].reset_index(drop=True), exceptions
+
+
+def clean_punches(punches, window_seconds=None):
+    """Debounce punches and drop unpairable days; returns (clean punches, exceptions table)"""
+    debounced, duplicates = debounce_punches(punches, window_seconds)
+    clean, unpaired = flag_unpaired(debounced)
+    return clean, combine_exceptions(duplicates, unpaired)
+
+
+def combine_exceptions(*tables):
+    """Concatenate exception tables sorted by employee and time"""
+    exceptions = pd.concat(tables)
+    return exceptions.sort_values(['AC-No.', 'Time'], kind='stable').reset_index(drop=True)
+
+
+def summarize_exceptions(exceptions):
+    """Punch count per exception reason"""
+    return exceptions.groupby('reason').size().rename('punches').reset_index()
@@ -1,53 +1,65 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
 import os
 from collections import defaultdict
 import streamlit as st
+from .attendance_index import AttendanceIndex
+from .readers import read_punch_file
+from .rules import assign_shift_dates
+from .cleaning import clean_punches
+from .profiling import stage
+
+@stage("read")
+def read_punches(file_path):
+    """Read a terminal export into a punch table with AC-No., Time, State and Date columns
+
+    The format (CSV, XLSX, legacy XLS, Parquet or Arrow) is detected from the
+    file contents, not its extension.
+    """
+    return assign_shift_dates(read_punch_file(file_path))
+
+@stage("pair")
+def pair_punches(df):
+    """Pair each employee's first C/In and last C/Out per day into attendance records"""
+    check_ins = df[df['State'] == 'C/In'].groupby(['AC-No.', 'Date'])['Time'].min()
+    check_outs = df[df['State'] == 'C/Out'].groupby(['AC-No.', 'Date'])['Time'].max()
+    days = pd.concat([check_ins.rename('check_in'), check_outs.rename('check_out')], axis=1, join='inner')
+    days = days[days['check_in'] < days['check_out']].rename_axis(['employee_id', 'date']).reset_index()
+    days['employee_id'] = days['employee_id'].astype(str)
+    days['total_hours'] = (days['check_out'] - days['check_in']).dt.total_seconds() / 3600
+    return days
+
+def summarize_punch_days(df):
+    """First C/In and last C/Out per (employee, day); either may be NaT"""
+    df = df.assign(employee_id=df['AC-No.'].astype(str))
+    check_ins = df[df['State'] == 'C/In'].groupby(['employee_id', 'Date'])['Time'].min()
+    check_outs = df[df['State'] == 'C/Out'].groupby(['employee_id', 'Date'])['Time'].max()
+    days = pd.concat([check_ins.rename('check_in'), check_outs.rename('check_out')], axis=1)
+    return days.rename_axis(['employee_id', 'date']).reset_index()
 
 def process_excel_file(file_path):
     """Process the Excel file and return attendance data"""
-    df = pd.read_excel(file_path)
-    
-    # Convert Time column to datetime
-    df['Time'] = pd.to_datetime(df['Time'])
-    df['Date'] = df['Time'].dt.date
-    
-    # Process records by employee and date
-    attendance_records = []
-    
-    for (employee_id, date), group in df.groupby(['AC-No.', 'Date']):
-        check_ins = group[group['State'] == 'C/In']['Time']
-        check_outs = group[group['State'] == 'C/Out']['Time']
-        
-        if not check_ins.empty and not check_outs.empty:
-            first_check_in = check_ins.min()
-            last_check_out = check_outs.max()
-            
-            if first_check_in < last_check_out:
-                attendance_records.append({
-                    'employee_id': str(employee_id),
-                    'date': date,
-                    'check_in': first_check_in,
-                    'check_out': last_check_out,
-                    'total_hours': (last_check_out - first_check_in).total_seconds() / 3600
-                })
-    
-    return pd.DataFrame(attendance_records)
+    punches, _ = clean_punches(read_punches(file_path))
+    return pair_punches(punches)
 
-def visualize_attendance(attendance_df):
-    """Create visualizations of the attendance data"""
+@stage("render charts")
+def visualize_attendance(attendance):
+    """Create visualizations of the attendance data (AttendanceIndex or DataFrame)"""
+    if not isinstance(attendance, AttendanceIndex):
+        attendance = AttendanceIndex(attendance)
+    attendance_df = attendance.df
     if attendance_df.empty:
         st.warning("No attendance records to visualize")
         return
     
+    import matplotlib.pyplot as plt
+
     # Create a directory for the visualizations
     os.makedirs('attendance_analysis', exist_ok=True)
     
     # 1. Daily hours worked by employee
     fig1, ax1 = plt.subplots(figsize=(12, 6))
-    for employee in attendance_df['employee_id'].unique():
-        employee_data = attendance_df[attendance_df['employee_id'] == employee]
+    for employee, employee_data in attendance.iter_employees():
         ax1.plot(employee_data['date'], employee_data['total_hours'], 
                 marker='o', label=f'Employee {employee}')
     
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from config import Config
+
+# Candidate bucket widths, smallest first
+BUCKET_SIZES = [
+    pd.Timedelta(seconds=1), pd.Timedelta(seconds=5), pd.Timedelta(seconds=15), pd.Timedelta(seconds=30),
+    pd.Timedelta(minutes=1), pd.Timedelta(minutes=5), pd.Timedelta(minutes=15), pd.Timedelta(minutes=30),
+    pd.Timedelta(hours=1), pd.Timedelta(hours=3), pd.Timedelta(hours=6), pd.Timedelta(hours=12),
+    pd.Timedelta(days=1), pd.Timedelta(days=7), pd.Timedelta(days=30),
+]
+
+
+def choose_bucket(span, max_points=None):
+    """Smallest bucket width that renders ``span`` in at most ``max_points`` buckets"""
+    max_points = max_points or Config.CHART_MAX_POINTS
+    span = pd.Timedelta(span)
+    for bucket in BUCKET_SIZES:
+        if span / bucket <= max_points:
+            return bucket
+    return pd.Timedelta(span / max_points).ceil('D')
+
+
+def effective_span(df, time_range=None, time_column='timestamp'):
+    """The span actually covered by the data, capped by the selected time range"""
+    if df.empty:
+        return pd.Timedelta(0)
+    span = df[time_column].max() - df[time_column].min()
+    return min(span, pd.Timedelta(time_range)) if time_range is not None else span
+
+
+def bucket_aggregate(df, column, time_range=None, max_points=None, time_column='timestamp'):
+    """Aggregate a time series into min/mean/max/p95/count per time bucket"""
+    bucket = choose_bucket(effective_span(df, time_range, time_column), max_points)
+    grouped = df.groupby(df[time_column].dt.floor(bucket))[column]
+    return pd.DataFrame({
+        'min': grouped.min(),
+        'mean': grouped.mean(),
+        'max': grouped.max(),
+        'p95': grouped.quantile(0.95),
+        'count': grouped.count(),
+    }).rename_axis(time_column).reset_index()
+
+
+def bucket_counts(df, time_range=None, max_points=None, time_column='timestamp'):
+    """Count rows per time bucket, with the bucket width chosen from the span"""
+    bucket = choose_bucket(effective_span(df, time_range, time_column), max_points)
+    counts = df.groupby(df[time_column].dt.floor(bucket)).size()
+    return counts.rename('count').rename_axis(time_column).reset_index()
+
@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+import pandas as pd
+import streamlit as st
+
+from config import Config
+
+CSV_MIME = "text/csv"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def iter_chunks(df, chunk_rows=None):
+    """Yield consecutive row slices of a DataFrame"""
+    chunk_rows = chunk_rows or Config.EXPORT_CHUNK_ROWS
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _cell(value):
+    """Convert a pandas/numpy scalar into a value spreadsheet writers understand"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def write_csv(df, path, chunk_rows=None):
+    """Write a DataFrame to CSV one chunk at a time"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+            return path
+        header = True
+        for chunk in iter_chunks(df, chunk_rows):
+            chunk.to_csv(f, index=False, header=header)
+            header = False
+    return path
+
+
+def write_xlsx(sheets, path, chunk_rows=None):
+    """Write {sheet name: DataFrame} to an XLSX file in constant-memory mode"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        return _write_xlsx_openpyxl(sheets, path, chunk_rows)
+
+    workbook = xlsxwriter.Workbook(path, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    })
+    try:
+        for sheet_name, df in sheets.items():
+            worksheet = workbook.add_worksheet(sheet_name[:31])
+            worksheet.write_row(0, 0, [str(column) for column in df.columns])
+            row_number = 1
+            for chunk in iter_chunks(df, chunk_rows):
+                for row in chunk.itertuples(index=False, name=None):
+                    worksheet.write_row(row_number, 0, [_cell(value) for value in row])
+                    row_number += 1
+    finally:
+        workbook.close()
+    return path
+
+
+def _write_xlsx_openpyxl(sheets, path, chunk_rows=None):
+    """Fallback XLSX writer using openpyxl's write-only (streaming) workbook"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name[:31])
+        worksheet.append([str(column) for column in df.columns])
+        for chunk in iter_chunks(df, chunk_rows):
+            for row in chunk.itertuples(index=False, name=None):
+                worksheet.append([_cell(value) for value in row])
+    workbook.save(path)
+    return path
+
+
+def export_to_file(sheets, fmt):
+    """Write report sheets to a temporary file and return its path"""
+    suffix = ".csv" if fmt == "csv" else ".xlsx"
+    handle, path = tempfile.mkstemp(prefix="attendance_export_", suffix=suffix)
+    os.close(handle)
+    try:
+        if fmt == "csv":
+            if len(sheets) != 1:
+                raise Exception("CSV export supports exactly one report at a time")
+            write_csv(next(iter(sheets.values())), path)
+        else:
+            write_xlsx(sheets, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def export_download_button(label, sheets, fmt, file_name, container=st, key=None):
+    """Render a download button serving the exported file instead of a base64 data URI"""
+    path = export_to_file(sheets, fmt)
+    try:
+        with open(path, "rb") as f:
+            container.download_button(
+                label,
+                data=f,
+                file_name=file_name,
+                mime=CSV_MIME if fmt == "csv" else XLSX_MIME,
+                key=key,
+            )
+    finally:
+        os.remove(path)
@@ -0,0 +1,40 @@
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library encoder
+    orjson = None
+
+JSON_HEADERS = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+
+
+def dumps(payload):
+    """Serialize a JSON-RPC payload to bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_request(payload, compress=False, min_size=1024):
+    """Request body and headers for a payload, gzipped when asked and worth it"""
+    body = dumps(payload)
+    headers = dict(JSON_HEADERS)
+    if compress and len(body) >= min_size:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def decode_response(response):
+    """JSON-RPC response body; requests has already undone any gzip encoding"""
+    try:
+        return loads(response.content)
+    except ValueError:
+        raise Exception(f"Invalid JSON-RPC response (HTTP {response.status_code})")
@@ -1,7 +1,36 @@
 import os
+import threading
+import time
+import pandas as pd
 import requests
 from dotenv import load_dotenv
 import streamlit as st
+from config import Config
+from .jsonrpc import decode_response, encode_request
+from .profiling import stage
+from .session_cache import default_session_cache
+from .timezones import to_utc_string, to_utc_strings
+
+class OdooError(Exception):
+    """Odoo answered a call with a JSON-RPC error, e.g. a failed constraint
+
+    Connection, timeout and authentication failures are plain Exceptions, so
+    callers can tell a record Odoo refused from a server they could not reach.
+    """
+
+def attendance_payloads(attendance_df):
+    """hr.attendance create values for a whole DataFrame at once
+
+    ``attendance_df`` has employee_id (the Odoo employee ID), check_in and an
+    optional check_out column of local times; timestamps are converted to UTC
+    strings column-wise instead of per record.
+    """
+    check_outs = attendance_df['check_out'] if 'check_out' in attendance_df else pd.Series(pd.NaT, index=attendance_df.index)
+    return pd.DataFrame({
+        "employee_id": attendance_df['employee_id'].astype(int).to_numpy(),
+        "check_in": to_utc_strings(attendance_df['check_in']).to_numpy(),
+        "check_out": to_utc_strings(check_outs).to_numpy(),
+    }).to_dict('records')
 
 def get_config(key, default=""):
     """Get configuration from either Streamlit secrets or environment variables"""
@@ -11,23 +40,49 @@ def get_config(key, default=""):
         return os.getenv(key, default)
 
 class OdooAPI:
-    def __init__(self):
+    def __init__(self, url=None, db=None, username=None, password=None, api_key=None,
+                 pool_size=None, rate_limiter=None, session_cache=None):
         # Load environment variables if running locally
         env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
         load_dotenv(env_path)
         
-        self.url = get_config("ODOO_URL")
-        self.db = get_config("ODOO_DB")
-        self.username = get_config("ODOO_USERNAME")
-        self.password = get_config("ODOO_PASSWORD")
-        self.api_key = get_config("api_key")
+        # Explicit arguments (e.g. a tenant's connection) override the configuration
+        self.url = url or get_config("ODOO_URL")
+        self.db = db or get_config("ODOO_DB")
+        self.username = username or get_config("ODOO_USERNAME")
+        self.password = password or get_config("ODOO_PASSWORD")
+        self.api_key = api_key or get_config("api_key")
         self.session = requests.Session()
+        if pool_size:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        self.rate_limiter = rate_limiter
+        self.gzip_requests = Config.ODOO_GZIP_REQUESTS
+        # Authentication is deferred to the first call; a cached session is
+        # reused when one exists for this (url, db, user)
+        self.session_cache = session_cache or default_session_cache()
         self.uid = None
-        self.login()
+        self._validated_at = 0.0
+        self._session_lock = threading.Lock()
+
+    def _post(self, path, payload):
+        """POST a JSON-RPC payload and return the decoded response
+
+        Large bodies are gzipped when ODOO_GZIP_REQUESTS is on; a server that
+        rejects them gets plain bodies from then on. Responses are gzipped by
+        the server whenever it supports it.
+        """
+        body, headers = encode_request(payload, self.gzip_requests, Config.ODOO_GZIP_MIN_BYTES)
+        response = self.session.post(f"{self.url}{path}", data=body, headers=headers)
+        if "Content-Encoding" in headers and response.status_code in (400, 415):
+            self.gzip_requests = False
+            body, headers = encode_request(payload)
+            response = self.session.post(f"{self.url}{path}", data=body, headers=headers)
+        return decode_response(response)
 
     def login(self):
         """Login to Odoo and get user ID"""
-        login_url = f"{self.url}/web/session/authenticate"
         login_data = {
             "jsonrpc": "2.0",
             "params": {
@@ -38,165 +93,434 @@ class OdooAPI:
             }
         }
         try:
-            response = self.session.post(login_url, json=login_data)
-            result = response.json()
+            with stage("odoo authenticate"):
+                result = self._post("/web/session/authenticate", login_data)
             if 'error' in result:
                 raise Exception(f"Login failed: {result['error']['data']['message']}")
             self.uid = result.get('result', {}).get('uid')
             if not self.uid:
                 raise Exception("Login failed: Could not get user ID")
+            self._validated_at = time.monotonic()
+            session_id = self._session_cookie()
+            if session_id:
+                self.session_cache.set(self.url, self.db, self.username, self._secret, session_id, self.uid)
             return self.uid
         except requests.exceptions.RequestException as e:
             raise Exception(f"Connection error: {str(e)}")
         except Exception as e:
             raise Exception(f"Login error: {str(e)}")
 
-    def get_employee_id(self, badge_id):
-        """Get Odoo employee ID from badge ID"""
-        endpoint = f"{self.url}/web/dataset/call_kw"
-        params = {
-            "model": "hr.employee",
-            "method": "search_read",
-            "args": [[["barcode", "=", str(badge_id)]]],
-            "kwargs": {
-                "fields": ["id", "name"],
-                "limit": 1
-            }
-        }
+    @property
+    def _secret(self):
+        # Cached sessions are tied to the credential, not just the user name
+        return f"{self.password}\0{self.api_key}"
+
+    def _session_cookie(self):
+        # The server may set its own domain-scoped cookie next to a restored
+        # one, so take the most recent rather than cookies.get()
+        values = [cookie.value for cookie in self.session.cookies if cookie.name == "session_id"]
+        return values[-1] if values else None
+
+    def check_session(self):
+        """Cheap keep-alive: the session's user ID if it is still valid, else None"""
+        try:
+            with stage("odoo session check"):
+                result = self._post("/web/session/get_session_info", {"jsonrpc": "2.0", "params": {}})
+        except Exception:
+            return None
+        info = result.get('result') or {}
+        if 'error' in result or not info.get('uid') or info.get('db') not in (None, self.db):
+            return None
+        return info['uid']
+
+    def ensure_session(self, force_check=False):
+        """Make sure there is an authenticated session, logging in only if needed
+
+        Reuses a cached session when one validates and re-checks sessions that
+        have been idle longer than SESSION_KEEPALIVE_SECONDS.
+        """
+        with self._session_lock:
+            idle = time.monotonic() - self._validated_at
+            if self.uid and not force_check and idle < Config.SESSION_KEEPALIVE_SECONDS:
+                return self.uid
+            if not self.uid:
+                cached = self.session_cache.get(self.url, self.db, self.username, self._secret)
+                if cached:
+                    self.session.cookies.set("session_id", cached["session_id"])
+            uid = self.check_session() if self._session_cookie() else None
+            if uid:
+                self.uid = uid
+                self._validated_at = time.monotonic()
+                return uid
+            self.session_cache.invalidate(self.url, self.db, self.username, self._secret)
+            self.session.cookies.clear()
+            self.uid = None
+            return self.login()
+
+    @staticmethod
+    def _session_expired(error):
+        data = error.get('data') or {}
+        return error.get('code') == 100 or data.get('name') == "odoo.http.SessionExpiredException"
+
+    def _call_kw(self, model, method, args, kwargs=None, error_message="Odoo call failed"):
+        """Call a model method through /web/dataset/call_kw and return its result"""
         data = {
             "jsonrpc": "2.0",
-            "params": params
+            "params": {
+                "model": model,
+                "method": method,
+                "args": args,
+                "kwargs": kwargs or {}
+            }
         }
         try:
-            response = self.session.post(endpoint, json=data)
-            result = response.json()
+            self.ensure_session()
+            for attempt in range(2):
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                with stage(f"odoo {model}.{method}"):
+                    result = self._post("/web/dataset/call_kw", data)
+                if 'error' in result and attempt == 0 and self._session_expired(result['error']):
+                    # The server dropped the session; authenticate again and retry once
+                    self.ensure_session(force_check=True)
+                    continue
+                break
             if 'error' in result:
-                raise Exception(f"Error getting employee: {result['error']['data']['message']}")
-            employees = result.get('result', [])
-            return employees[0]['id'] if employees else None
+                if self._session_expired(result['error']):
+                    raise Exception(result['error']['data']['message'])
+                raise OdooError(f"{error_message}: {result['error']['data']['message']}")
+            self._validated_at = time.monotonic()
+            return result.get('result')
+        except OdooError:
+            raise
         except Exception as e:
-            raise Exception(f"Error getting employee: {str(e)}")
+            raise Exception(f"{error_message}: {str(e)}")
+
+    def get_employee_id(self, badge_id):
+        """Get Odoo employee ID from badge ID"""
+        employees = self._call_kw(
+            "hr.employee",
+            "search_read",
+            [[["barcode", "=", str(badge_id)]]],
+            {"fields": ["id", "name"], "limit": 1},
+            error_message="Error getting employee"
+        ) or []
+        return employees[0]['id'] if employees else None
+
+    def get_employee_ids(self, badge_ids, batch_size=500, on_batch=None):
+        """Map badge IDs to Odoo employee IDs with batched search_read calls
+
+        ``on_batch`` is called with the number of badges in each finished batch.
+        """
+        badge_ids = [str(badge_id) for badge_id in badge_ids]
+        employee_ids = {}
+        for start in range(0, len(badge_ids), batch_size):
+            batch = badge_ids[start:start + batch_size]
+            employees = self._call_kw(
+                "hr.employee",
+                "search_read",
+                [[["barcode", "in", batch]]],
+                {"fields": ["id", "barcode"]},
+                error_message="Error getting employees"
+            ) or []
+            for employee in employees:
+                employee_ids.setdefault(employee['barcode'], employee['id'])
+            if on_batch:
+                on_batch(len(batch))
+        return employee_ids
 
     def check_missing_employees(self, badge_ids):
         """Check which employees need to be created in Odoo"""
+        employee_ids = self.get_employee_ids(badge_ids)
         missing_employees = []
         existing_employees = []
         
         for badge_id in badge_ids:
-            if not self.get_employee_id(badge_id):
+            if str(badge_id) not in employee_ids:
                 missing_employees.append(badge_id)
             else:
                 existing_employees.append(badge_id)
         
         return missing_employees, existing_employees
 
-    def create_attendance(self, employee_id, check_in, check_out=None):
-        """Create attendance record in Odoo"""
-        endpoint = f"{self.url}/web/dataset/call_kw"
-        
-        def format_datetime(dt):
-            return dt.strftime('%Y-%m-%d %H:%M:%S')
-        
+    @staticmethod
+    def _attendance_values(employee_id, check_in, check_out=None):
+        """Build hr.attendance values from local datetimes"""
         attendance_data = {
             "employee_id": employee_id,
-            "check_in": format_datetime(check_in),
+            "check_in": to_utc_string(check_in),
         }
-        if check_out:
-            attendance_data["check_out"] = format_datetime(check_out)
+        if not pd.isna(check_out):
+            attendance_data["check_out"] = to_utc_string(check_out)
+        return attendance_data
 
-        params = {
-            "model": "hr.attendance",
-            "method": "create",
-            "args": [attendance_data],
-            "kwargs": {}
-        }
-        data = {
-            "jsonrpc": "2.0",
-            "params": params
-        }
+    def create_attendance(self, employee_id, check_in, check_out=None):
+        """Create attendance record in Odoo"""
+        return self._call_kw(
+            "hr.attendance",
+            "create",
+            [self._attendance_values(employee_id, check_in, check_out)],
+            error_message="Error creating attendance"
+        )
+
+    def create_attendances(self, records):
+        """Create several attendance records with one multi-record create call
+
+        ``records`` is a DataFrame or a list of dicts with employee_id, check_in
+        and an optional check_out; returns the new IDs in the same order.
+        """
+        frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records))
+        return self.create_attendance_values(attendance_payloads(frame))
+
+    def create_attendance_values(self, values):
+        """Create attendance records from values prepared by attendance_payloads"""
+        result = self._call_kw(
+            "hr.attendance",
+            "create",
+            [values],
+            error_message="Error creating attendances"
+        )
+        return result if isinstance(result, list) else [result]
+
+    def create_attendance_values_each(self, values):
+        """Create attendance records in one call, falling back to one call per record
+
+        Returns an (attendance_id, error) pair per record, so a record Odoo
+        rejects (an overlap, an archived employee) does not fail the others.
+        Only an OdooError triggers the fallback; connection and authentication
+        errors are raised as they are, since every record would fail the same way.
+        """
         try:
-            response = self.session.post(endpoint, json=data)
-            result = response.json()
-            if 'error' in result:
-                raise Exception(f"Error creating attendance: {result['error']['data']['message']}")
-            return result.get('result')
-        except Exception as e:
-            raise Exception(f"Error creating attendance: {str(e)}")
+            return [(attendance_id, None) for attendance_id in self.create_attendance_values(values)]
+        except OdooError:
+            results = []
+            for value in values:
+                try:
+                    results.append((self.create_attendance_values([value])[0], None))
+                except OdooError as e:
+                    results.append((None, str(e)))
+            return results
+
+    def update_attendance(self, attendance_id, check_in=None, check_out=None):
+        """Update the check-in/check-out of an existing attendance record"""
+        values = {}
+        if check_in:
+            values["check_in"] = to_utc_string(check_in)
+        if check_out:
+            values["check_out"] = to_utc_string(check_out)
+        return self._call_kw(
+            "hr.attendance",
+            "write",
+            [[attendance_id], values],
+            error_message="Error updating attendance"
+        )
 
     def create_employee(self, badge_id, name):
         """Create a new employee in Odoo"""
-        endpoint = f"{self.url}/web/dataset/call_kw"
-        params = {
-            "model": "hr.employee",
-            "method": "create",
-            "args": [{
+        return self._call_kw(
+            "hr.employee",
+            "create",
+            [{
                 "name": name,
                 "barcode": str(badge_id),
                 "pin": str(badge_id),
             }],
-            "kwargs": {}
-        }
-        data = {
-            "jsonrpc": "2.0",
-            "params": params
-        }
-        try:
-            response = self.session.post(endpoint, json=data)
-            result = response.json()
-            if 'error' in result:
-                raise Exception(f"Error creating employee: {result['error']['data']['message']}")
-            return result.get('result')
-        except Exception as e:
-            raise Exception(f"Error creating employee: {str(e)}")
+            error_message="Error creating employee"
+        )
+
+    def create_employees(self, employees):
+        """Create several employees with one multi-record create call
+
+        ``employees`` is a list of (badge_id, name) tuples; returns the new IDs
+        in the same order.
+        """
+        vals_list = [{
+            "name": name,
+            "barcode": str(badge_id),
+            "pin": str(badge_id),
+        } for badge_id, name in employees]
+        result = self._call_kw(
+            "hr.employee",
+            "create",
+            [vals_list],
+            error_message="Error creating employees"
+        )
+        return result if isinstance(result, list) else [result]
 
     def get_all_employees(self):
         """Get all employees from Odoo"""
-        endpoint = f"{self.url}/web/dataset/call_kw"
-        params = {
-            "model": "hr.employee",
-            "method": "search_read",
-            "args": [[]],  # Empty domain to get all records
-            "kwargs": {
-                "fields": ["id", "name", "barcode"],
-            }
-        }
-        data = {
-            "jsonrpc": "2.0",
-            "params": params
-        }
-        try:
-            response = self.session.post(endpoint, json=data)
-            result = response.json()
-            if 'error' in result:
-                raise Exception(f"Error getting employees: {result['error']['data']['message']}")
-            return result.get('result', [])
-        except Exception as e:
-            raise Exception(f"Error getting employees: {str(e)}")
+        return self._call_kw(
+            "hr.employee",
+            "search_read",
+            [[]],  # Empty domain to get all records
+            {"fields": ["id", "name", "barcode"]},
+            error_message="Error getting employees"
+        ) or []
 
     def get_recent_attendance(self, limit=100):
         """Get recent attendance records from Odoo"""
-        endpoint = f"{self.url}/web/dataset/call_kw"
-        params = {
-            "model": "hr.attendance",
-            "method": "search_read",
-            "args": [[]],
-            "kwargs": {
+        return self._call_kw(
+            "hr.attendance",
+            "search_read",
+            [[]],
+            {
                 "fields": ["employee_id", "check_in", "check_out"],
                 "limit": limit,
                 "order": "create_date desc"
-            }
-        }
-        data = {
-            "jsonrpc": "2.0",
-            "params": params
-        }
+            },
+            error_message="Error getting attendance"
+        ) or []
+
+    def get_employee_barcodes(self, employee_ids):
+        """Map Odoo employee IDs to their badge IDs (barcodes)"""
+        if not employee_ids:
+            return {}
+        employees = self._call_kw(
+            "hr.employee",
+            "read",
+            [list(employee_ids), ["barcode"]],
+            error_message="Error getting employee badges"
+        ) or []
+        return {employee["id"]: employee.get("barcode") or None for employee in employees}
+
+    def get_latest_attendance_write_date(self):
+        """The most recent write_date of any hr.attendance record, or None"""
+        rows = self._call_kw(
+            "hr.attendance",
+            "search_read",
+            [[]],
+            {"fields": ["write_date"], "order": "write_date desc", "limit": 1},
+            error_message="Error getting attendance watermark"
+        )
+        return rows[0]["write_date"] if rows else None
+
+    def iter_changed_attendance(self, since=None, until=None, page_size=500):
+        """Yield pages of hr.attendance rows with since <= write_date <= until
+
+        Pages use keyset pagination on id, so rows edited while paging are
+        neither skipped nor repeated; rows edited after ``until`` are left for
+        the next pull.
+        """
+        fields = ["id", "employee_id", "check_in", "check_out", "worked_hours", "write_date"]
+        domain = []
+        if since:
+            domain.append(["write_date", ">=", since])
+        if until:
+            domain.append(["write_date", "<=", until])
+        last_id = 0
+        while True:
+            page = self._call_kw(
+                "hr.attendance",
+                "search_read",
+                [domain + [["id", ">", last_id]]],
+                {"fields": fields, "order": "id asc", "limit": page_size},
+                error_message="Error getting changed attendance"
+            ) or []
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last_id = page[-1]["id"]
+
+    def count_attendance(self, domain=None):
+        """Count hr.attendance records matching a domain without fetching them"""
+        return self._call_kw(
+            "hr.attendance",
+            "search_count",
+            [domain or []],
+            error_message="Error counting attendance"
+        )
+
+    def read_group(self, model, domain, fields, groupby, lazy=False, orderby=None, limit=None):
+        """Aggregate records inside Odoo with read_group"""
+        kwargs = {"lazy": lazy}
+        if Config.TIMEZONE:
+            # Group dates by local rather than UTC days
+            kwargs["context"] = {"tz": Config.TIMEZONE}
+        if orderby:
+            kwargs["orderby"] = orderby
+        if limit:
+            kwargs["limit"] = limit
+        return self._call_kw(
+            model,
+            "read_group",
+            [domain, fields, groupby],
+            kwargs,
+            error_message=f"Error aggregating {model}"
+        ) or []
+
+    @staticmethod
+    def _attendance_domain(date_from=None, date_to=None):
+        """check_in domain covering whole local days, in Odoo's UTC"""
+        domain = []
+        if date_from:
+            domain.append(["check_in", ">=", to_utc_string(f"{date_from} 00:00:00")])
+        if date_to:
+            domain.append(["check_in", "<=", to_utc_string(f"{date_to} 23:59:59")])
+        return domain
+
+    def get_attendance_hours(self, interval="day", date_from=None, date_to=None):
+        """Worked hours per employee per day/week/month, aggregated by Odoo"""
+        period = f"check_in:{interval}"
+        groups = self.read_group(
+            "hr.attendance",
+            self._attendance_domain(date_from, date_to),
+            ["worked_hours:sum"],
+            ["employee_id", period],
+            orderby=period
+        )
+        rows = []
+        for group in groups:
+            employee = group.get("employee_id") or [False, "Unknown"]
+            period_range = (group.get("__range") or {}).get(period) or {}
+            rows.append({
+                "employee_id": employee[0],
+                "employee": employee[1],
+                "period": group.get(period),
+                "period_start": period_range.get("from"),
+                "hours": group.get("worked_hours") or 0.0,
+                "attendances": group.get("__count", 0),
+            })
+        return rows
+
+    def get_attendance_counts_by_department(self, date_from=None, date_to=None):
+        """Attendance count and worked hours per department, aggregated by Odoo
+
+        Groups on hr.attendance.department_id where it is stored; otherwise
+        groups per employee and folds the employees into their departments.
+        """
+        domain = self._attendance_domain(date_from, date_to)
         try:
-            response = self.session.post(endpoint, json=data)
-            result = response.json()
-            if 'error' in result:
-                raise Exception(f"Error getting attendance: {result['error']['data']['message']}")
-            return result.get('result', [])
+            groups = self.read_group("hr.attendance", domain, ["worked_hours:sum"], ["department_id"])
+            return [{
+                "department": (group.get("department_id") or [False, "No Department"])[1],
+                "attendances": group.get("__count", 0),
+                "hours": group.get("worked_hours") or 0.0,
+            } for group in groups]
         except Exception as e:
-            raise Exception(f"Error getting attendance: {str(e)}")
+            # Only a missing or unstored department_id falls back; auth,
+            # network and rate-limit errors are real failures
+            if "department_id" not in str(e):
+                raise
 
-    # ... (rest of the OdooAPI class methods)
\ No newline at end of file
+        groups = self.read_group("hr.attendance", domain, ["worked_hours:sum"], ["employee_id"])
+        employee_ids = [group["employee_id"][0] for group in groups if group.get("employee_id")]
+        employees = self._call_kw(
+            "hr.employee",
+            "read",
+            [employee_ids, ["department_id"]],
+            error_message="Error getting employee departments"
+        ) if employee_ids else []
+        departments = {
+            employee["id"]: (employee.get("department_id") or [False, "No Department"])[1]
+            for employee in employees
+        }
+        totals = {}
+        for group in groups:
+            employee_id = (group.get("employee_id") or [False])[0]
+            department = departments.get(employee_id, "No Department")
+            total = totals.setdefault(department, {"department": department, "attendances": 0, "hours": 0.0})
+            total["attendances"] += group.get("__count", 0)
+            total["hours"] += group.get("worked_hours") or 0.0
+        return list(totals.values())
@@ -0,0 +1,111 @@
+import cProfile
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import Config
+
+_profiles = deque(maxlen=Config.PROFILE_HISTORY)
+_profiles_lock = threading.Lock()
+_local = threading.local()
+
+
+def profiling_enabled():
+    return Config.PROFILING
+
+
+class ProfileRun:
+    """Timing and cProfile results of one script rerun or pipeline run"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now()
+        self.duration = None
+        self.stages = []
+        self.functions = []
+
+    def add_stage(self, name, seconds, depth):
+        self.stages.append({"stage": name, "seconds": seconds, "depth": depth})
+
+    def stage_totals(self):
+        """Total seconds per top-level stage name, slowest first"""
+        totals = {}
+        for stage in self.stages:
+            if stage["depth"] == 0:
+                totals[stage["stage"]] = totals.get(stage["stage"], 0.0) + stage["seconds"]
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def _hot_functions(profiler, limit):
+    """The ``limit`` functions with the highest cumulative time"""
+    stats = pstats.Stats(profiler)
+    functions = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        functions.append({
+            "function": function,
+            "location": f"{filename}:{line}",
+            "calls": calls,
+            "own_seconds": total,
+            "cumulative_seconds": cumulative,
+        })
+    functions.sort(key=lambda item: item["cumulative_seconds"], reverse=True)
+    return functions[:limit]
+
+
+@contextmanager
+def profile_run(name):
+    """Profile a whole rerun or pipeline run when profiling is enabled
+
+    Nested calls are recorded as stages of the enclosing run.
+    """
+    if not profiling_enabled():
+        yield None
+        return
+    if getattr(_local, "run", None) is not None:
+        with stage(name):
+            yield _local.run
+        return
+
+    run = ProfileRun(name)
+    profiler = cProfile.Profile()
+    _local.run, _local.depth = run, 0
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield run
+    finally:
+        profiler.disable()
+        run.duration = time.perf_counter() - started
+        run.functions = _hot_functions(profiler, Config.PROFILE_TOP_FUNCTIONS)
+        _local.run = None
+        with _profiles_lock:
+            _profiles.append(run)
+
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage inside the current profile run (no-op otherwise)
+
+    Usable as a context manager or as a function decorator.
+    """
+    run = getattr(_local, "run", None)
+    if run is None:
+        yield
+        return
+    depth = _local.depth
+    _local.depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        run.add_stage(name, time.perf_counter() - started, depth)
+
+
+def recent_profiles():
+    """The last PROFILE_HISTORY runs, newest first"""
+    with _profiles_lock:
+        return list(reversed(_profiles))
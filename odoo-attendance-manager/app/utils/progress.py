@@ -0,0 +1,152 @@
+import sys
+import time
+
+from config import Config
+
+
+def _running_in_streamlit():
+    try:
+        import streamlit.runtime
+        return streamlit.runtime.exists()
+    except Exception:
+        return False
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class NullProgressSink:
+    """Discards progress updates"""
+
+    def update(self, fraction, text):
+        pass
+
+    def done(self, text):
+        pass
+
+
+class ConsoleProgressSink:
+    """Writes progress to a console stream, one line per update"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def update(self, fraction, text):
+        self.stream.write(f"[{fraction:6.1%}] {text}\n")
+        self.stream.flush()
+
+    def done(self, text):
+        self.stream.write(f"[done] {text}\n")
+        self.stream.flush()
+
+
+class StreamlitProgressSink:
+    """Drives an st.progress bar and a status line in the current container"""
+
+    def __init__(self, container=None):
+        import streamlit as st
+
+        container = container or st
+        self.progress_bar = container.progress(0)
+        self.status_text = container.empty()
+
+    def update(self, fraction, text):
+        self.progress_bar.progress(min(max(fraction, 0.0), 1.0))
+        self.status_text.text(text)
+
+    def done(self, text):
+        self.progress_bar.progress(1.0)
+        self.status_text.text(f"✅ {text}")
+
+
+def default_sink():
+    """Streamlit widgets inside a Streamlit run, console output otherwise"""
+    return StreamlitProgressSink() if _running_in_streamlit() else ConsoleProgressSink()
+
+
+class ProgressReporter:
+    """Rate-limited progress reporting with throughput and ETA
+
+    A sink is only updated when at least ``min_interval`` seconds and
+    ``min_step`` of the total have passed since the last update, so per-row
+    calls to ``advance`` stay cheap even when every update is a websocket
+    message.
+    """
+
+    def __init__(self, total, label, sink=None, min_interval=None, min_step=None):
+        self.total = max(int(total), 0)
+        self.label = label
+        self.sink = sink if sink is not None else default_sink()
+        self.min_interval = Config.PROGRESS_MIN_INTERVAL if min_interval is None else min_interval
+        self.min_step = Config.PROGRESS_MIN_STEP if min_step is None else min_step
+        self.done_count = 0
+        self.started_at = time.monotonic()
+        self._last_time = None
+        self._last_fraction = 0.0
+        self._finished = False
+
+    def __enter__(self):
+        self._emit()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finish()
+        return False
+
+    @property
+    def fraction(self):
+        return self.done_count / self.total if self.total else 1.0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def rate(self):
+        """Items per second since the reporter was created"""
+        elapsed = self.elapsed
+        return self.done_count / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds remaining, or None before any progress"""
+        rate = self.rate
+        return (self.total - self.done_count) / rate if rate > 0 else None
+
+    def message(self):
+        text = f"{self.label}: {self.done_count:,} of {self.total:,}"
+        if self.done_count:
+            text += f" ({self.rate:,.0f}/s"
+            if self.eta is not None and self.done_count < self.total:
+                text += f", ETA {_format_duration(self.eta)}"
+            text += ")"
+        return text
+
+    def _emit(self):
+        self._last_time = time.monotonic()
+        self._last_fraction = self.fraction
+        self.sink.update(self.fraction, self.message())
+
+    def advance(self, count=1):
+        """Record ``count`` more items and update the sink if the throttle allows"""
+        self.done_count = min(self.done_count + count, self.total) if self.total else self.done_count + count
+        if self._last_time is None:
+            self._emit()
+            return
+        if (time.monotonic() - self._last_time >= self.min_interval
+                and self.fraction - self._last_fraction >= self.min_step):
+            self._emit()
+
+    def finish(self, text=None):
+        """Send the final update regardless of throttling"""
+        if self._finished:
+            return
+        self._finished = True
+        self.sink.done(text or f"{self.label}: {self.done_count:,} done in {_format_duration(self.elapsed)}")
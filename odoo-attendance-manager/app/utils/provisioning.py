@@ -0,0 +1,105 @@
+import pandas as pd
+
+from config import Config
+from .progress import ProgressReporter, default_sink
+from .profiling import stage
+
+# Accepted column names in a badge -> name mapping file
+BADGE_COLUMNS = ["badge_id", "badge", "barcode", "ac-no.", "ac-no", "employee_id"]
+NAME_COLUMNS = ["name", "employee_name", "full_name"]
+
+
+def default_employee_name(badge_id):
+    return f"Employee {badge_id}"
+
+
+def load_name_mapping(file):
+    """Read a CSV/Excel file mapping badge IDs to employee names"""
+    file_name = getattr(file, "name", str(file)).lower()
+    if file_name.endswith(".csv"):
+        df = pd.read_csv(file, dtype=str)
+    else:
+        df = pd.read_excel(file, dtype=str)
+
+    columns = {str(column).strip().lower(): column for column in df.columns}
+    badge_column = next((columns[c] for c in BADGE_COLUMNS if c in columns), None)
+    name_column = next((columns[c] for c in NAME_COLUMNS if c in columns), None)
+    if badge_column is None or name_column is None:
+        if len(df.columns) < 2:
+            raise Exception("Mapping file needs a badge ID column and a name column")
+        badge_column, name_column = df.columns[:2]
+
+    df = df[[badge_column, name_column]].dropna()
+    return {
+        str(badge_id).strip(): str(name).strip()
+        for badge_id, name in df.itertuples(index=False, name=None)
+        if str(name).strip()
+    }
+
+
+def build_name_table(missing_employees, mapping=None):
+    """Editable badge/name table for the missing employees"""
+    mapping = mapping or {}
+    return pd.DataFrame({
+        "badge_id": [str(badge_id) for badge_id in missing_employees],
+        "name": [mapping.get(str(badge_id), default_employee_name(badge_id)) for badge_id in missing_employees],
+    })
+
+
+@stage("create employees")
+def provision_employees(odoo, names, batch_size=None, progress=None):
+    """Create employees in batches and return a per-badge report DataFrame
+
+    ``names`` maps badge IDs to names. Badges that already exist in Odoo are
+    reported as ``exists``. When a batch create fails, its records are retried
+    one by one so a single bad record does not fail the whole batch.
+    ``progress`` is a progress sink; by default Streamlit widgets or the console.
+    """
+    batch_size = batch_size or Config.EMPLOYEE_BATCH_SIZE
+    sink = progress if progress is not None else default_sink()
+    names = {str(badge_id): name for badge_id, name in names.items()}
+    report = {}
+
+    with ProgressReporter(len(names), "Checking existing employees", sink) as reporter:
+        existing = odoo.get_employee_ids(list(names), on_batch=reporter.advance)
+    for badge_id, employee_id in existing.items():
+        report[badge_id] = ("exists", employee_id, "")
+
+    pending = []
+    for badge_id, name in names.items():
+        if badge_id in report:
+            continue
+        if not name or not str(name).strip():
+            report[badge_id] = ("failed", None, "Employee name is empty")
+            continue
+        pending.append((badge_id, str(name).strip()))
+
+    reporter = ProgressReporter(len(pending), "Creating employees", sink)
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        try:
+            employee_ids = odoo.create_employees(batch)
+            for (badge_id, _), employee_id in zip(batch, employee_ids):
+                report[badge_id] = ("created", employee_id, "")
+        except Exception:
+            for badge_id, name in batch:
+                try:
+                    report[badge_id] = ("created", odoo.create_employee(badge_id, name), "")
+                except Exception as e:
+                    report[badge_id] = ("failed", None, str(e))
+        reporter.advance(len(batch))
+    reporter.finish()
+
+    return pd.DataFrame(
+        [
+            {
+                "badge_id": badge_id,
+                "name": names[badge_id],
+                "status": report[badge_id][0],
+                "employee_id": report[badge_id][1],
+                "error": report[badge_id][2],
+            }
+            for badge_id in names
+        ],
+        columns=["badge_id", "name", "status", "employee_id", "error"],
+    )
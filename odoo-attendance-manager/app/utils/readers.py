@@ -0,0 +1,183 @@
+import csv
+import io
+import os
+
+import pandas as pd
+
+from config import Config
+
+PUNCH_COLUMNS = ['AC-No.', 'Time', 'State']
+
+# Leading bytes of each binary format; anything else is treated as delimited text
+MAGIC_BYTES = [
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'xls'),
+    (b'PK\x03\x04', 'xlsx'),
+    (b'PAR1', 'parquet'),
+    (b'ARROW1', 'arrow'),
+    (b'\xff\xff\xff\xff', 'arrow_stream'),
+]
+
+READERS = {}
+
+
+def register_reader(fmt):
+    """Register a function reading ``fmt`` into a raw DataFrame"""
+    def decorator(func):
+        READERS[fmt] = func
+        return func
+    return decorator
+
+
+def _peek(source, size):
+    """Read the first bytes of a path or file-like object without consuming it"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head if isinstance(head, bytes) else head.encode()
+
+
+def sniff_format(source):
+    """Detect the file format from its leading bytes"""
+    head = _peek(source, 8)
+    for magic, fmt in MAGIC_BYTES:
+        if head.startswith(magic):
+            return fmt
+    return 'csv'
+
+
+def _header_line(source):
+    lines = _peek(source, 4096).decode('utf-8-sig', errors='ignore').splitlines()
+    return lines[0] if lines else ''
+
+
+def sniff_delimiter(source):
+    """Pick the delimiter of a text export from its header line"""
+    header = _header_line(source)
+    return max([',', '\t', ';', '|'], key=header.count)
+
+
+def _punch_column_names(source, delimiter):
+    """Map each punch column to its name in the export header, which may be padded"""
+    header = next(csv.reader([_header_line(source)], delimiter=delimiter), [])
+    names = {name.strip(): name for name in header}
+    missing = [column for column in PUNCH_COLUMNS if column not in names]
+    if missing:
+        raise Exception(f"Missing required columns: {', '.join(missing)}")
+    return {column: names[column] for column in PUNCH_COLUMNS}
+
+
+@register_reader('csv')
+def read_csv(source):
+    """Multi-threaded CSV read through pyarrow, falling back to pandas"""
+    delimiter = sniff_delimiter(source)
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        return pd.read_csv(
+            source,
+            sep=delimiter,
+            usecols=lambda column: column.strip() in PUNCH_COLUMNS,
+            dtype={'AC-No.': str, 'State': 'category'},
+        )
+
+    # pyarrow selects columns by their exact header names
+    names = _punch_column_names(source, delimiter)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={names['AC-No.']: pa.string(), names['State']: pa.string()},
+        include_columns=list(names.values()),
+        timestamp_parsers=[Config.PUNCH_TIME_FORMAT] if Config.PUNCH_TIME_FORMAT else None,
+    )
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+        convert_options=convert_options,
+    )
+    return table.to_pandas()
+
+
+@register_reader('xlsx')
+def read_xlsx(source):
+    return pd.read_excel(source, engine='openpyxl', dtype={'AC-No.': str})
+
+
+@register_reader('xls')
+def read_xls(source):
+    return pd.read_excel(source, engine='xlrd', dtype={'AC-No.': str})
+
+
+@register_reader('parquet')
+def read_parquet(source):
+    return pd.read_parquet(source, columns=PUNCH_COLUMNS)
+
+
+@register_reader('arrow')
+def read_arrow(source):
+    from pyarrow import ipc
+
+    return ipc.open_file(source).read_all().select(PUNCH_COLUMNS).to_pandas()
+
+
+@register_reader('arrow_stream')
+def read_arrow_stream(source):
+    from pyarrow import ipc
+
+    return ipc.open_stream(source).read_all().select(PUNCH_COLUMNS).to_pandas()
+
+
+def normalize_punches(df):
+    """Coerce a raw export into the punch table: AC-No. (str), Time (datetime64), State, Date"""
+    df = df.rename(columns=lambda column: str(column).strip())
+    missing = [column for column in PUNCH_COLUMNS if column not in df.columns]
+    if missing:
+        raise Exception(f"Missing required columns: {', '.join(missing)}")
+    df = df[PUNCH_COLUMNS].dropna()
+
+    badges = df['AC-No.']
+    if pd.api.types.is_numeric_dtype(badges):
+        badges = badges.astype('int64')
+    times = df['Time']
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times, format=Config.PUNCH_TIME_FORMAT or None)
+
+    df = pd.DataFrame({
+        'AC-No.': badges.astype(str).str.strip(),
+        'Time': times,
+        'State': df['State'].astype(str).str.strip().astype('category'),
+    })
+    df['Date'] = df['Time'].dt.date
+    return df.reset_index(drop=True)
+
+
+def read_punch_file(source, fmt=None):
+    """Read any supported export (detected by magic bytes) into the normalized punch table"""
+    fmt = fmt or sniff_format(source)
+    if fmt not in READERS:
+        raise Exception(f"Unsupported file format: {fmt}")
+    if not isinstance(source, (str, os.PathLike)) and not hasattr(source, 'seek'):
+        source = io.BytesIO(source.read())
+    return normalize_punches(READERS[fmt](source))
+
+
+def read_csv_tail(path, offset=0):
+    """Punches in the complete lines of a delimited export from byte ``offset`` on
+
+    Returns (punches, end offset). Only the header line and the bytes after
+    ``offset`` are read; a last line that is still being written is left for
+    the next call.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        if not header.endswith(b'\n'):
+            return normalize_punches(pd.DataFrame(columns=PUNCH_COLUMNS)), 0
+        start = max(offset, len(header))
+        f.seek(start)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if not data[:end].strip():
+        return normalize_punches(pd.DataFrame(columns=PUNCH_COLUMNS)), start + end
+    return read_punch_file(io.BytesIO(header + data[:end]), fmt='csv'), start + end
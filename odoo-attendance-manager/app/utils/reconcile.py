@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from config import Config
+from .profiling import stage
+from .progress import ProgressReporter, default_sink
+from .timezones import to_local_strings
+
+# Renamed when pulled times switched from UTC to local, so older rows are pulled again
+WATERMARK_KEY = "odoo_attendance_write_date_local"
+
+STATUS_LABELS = {
+    'match': "Same in Odoo and on the device",
+    'changed_in_odoo': "Times differ between Odoo and the device",
+    'missing_in_odoo': "Paired on the device but not in Odoo",
+    'only_in_odoo': "In Odoo but not paired from device punches",
+}
+
+
+@stage("pull odoo changes")
+def pull_odoo_changes(odoo, store, page_size=None, progress=None):
+    """Fetch hr.attendance rows written since the stored watermark into the local store
+
+    Returns the number of rows pulled. The watermark only moves forward once
+    every page has been stored, so an interrupted pull is simply repeated.
+    """
+    page_size = page_size or Config.ODOO_PULL_PAGE_SIZE
+    sink = progress if progress is not None else default_sink()
+    since = store.get_sync_value(WATERMARK_KEY)
+    until = odoo.get_latest_attendance_write_date()
+    if not until:
+        return 0
+
+    total = odoo.count_attendance([["write_date", ">=", since], ["write_date", "<=", until]] if since else [])
+    badges = {}
+    pulled = 0
+    with ProgressReporter(total, "Pulling Odoo attendance", sink) as reporter:
+        for page in odoo.iter_changed_attendance(since, until, page_size):
+            employee_ids = {row["employee_id"][0] for row in page if row.get("employee_id")}
+            badges.update(odoo.get_employee_barcodes(employee_ids - set(badges)))
+            # Odoo stores UTC; the device attendances are in local time
+            check_ins = to_local_strings([row["check_in"] for row in page])
+            check_outs = to_local_strings([row["check_out"] for row in page])
+            store.upsert_odoo_attendances([
+                {
+                    "odoo_id": row["id"],
+                    "odoo_employee_id": row["employee_id"][0] if row.get("employee_id") else None,
+                    "employee_id": badges.get(row["employee_id"][0]) if row.get("employee_id") else None,
+                    "check_in": check_in,
+                    "check_out": check_out,
+                    "worked_hours": row.get("worked_hours") or 0.0,
+                    "write_date": row["write_date"],
+                }
+                for row, check_in, check_out in zip(page, check_ins, check_outs)
+            ])
+            pulled += len(page)
+            reporter.advance(len(page))
+    store.set_sync_value(WATERMARK_KEY, until)
+    return pulled
+
+
+@stage("reconcile")
+def reconcile(store, start=None, end=None, tolerance_seconds=None):
+    """Diff device attendances against the pulled Odoo attendances per (badge, day)"""
+    tolerance = pd.Timedelta(seconds=Config.RECONCILE_TOLERANCE_SECONDS if tolerance_seconds is None else tolerance_seconds)
+    device = store.query_attendance(start=start, end=end)
+    odoo = store.query_odoo_attendance(start=start, end=end)
+    odoo = odoo[odoo['employee_id'].notna()]
+
+    diff = device.merge(odoo, on=['employee_id', 'date'], how='outer', indicator=True)
+    check_in_delta = (diff['odoo_check_in'] - diff['check_in']).abs()
+    check_out_delta = (diff['odoo_check_out'] - diff['check_out']).abs()
+    same = (check_in_delta <= tolerance) & (check_out_delta <= tolerance)
+
+    diff['status'] = np.select(
+        [diff['_merge'] == 'left_only', diff['_merge'] == 'right_only', same],
+        ['missing_in_odoo', 'only_in_odoo', 'match'],
+        default='changed_in_odoo'
+    )
+    diff['check_in_delta_min'] = (diff['odoo_check_in'] - diff['check_in']).dt.total_seconds().div(60).round(1)
+    diff['check_out_delta_min'] = (diff['odoo_check_out'] - diff['check_out']).dt.total_seconds().div(60).round(1)
+    return diff.drop(columns=['_merge']).sort_values(['employee_id', 'date']).reset_index(drop=True)
+
+
+def summarize_reconciliation(diff):
+    """Row count per reconciliation status"""
+    counts = diff['status'].value_counts().rename_axis('status').rename('days').reset_index()
+    counts['meaning'] = counts['status'].map(STATUS_LABELS)
+    return counts
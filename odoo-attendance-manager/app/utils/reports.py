@@ -0,0 +1,76 @@
+
+from .rules import apply_rules, pay_period_summary
+
+REPORT_TYPES = [
+    "Daily Summary", "Employee Summary", "Late Arrivals", "Early Departures",
+    "Overtime", "Payroll Summary", "Raw Attendance",
+]
+
+
+def daily_summary(attendance_df):
+    return attendance_df.groupby('date').agg(
+        employees=('employee_id', 'count'),
+        avg_hours=('total_hours', 'mean'),
+        min_hours=('total_hours', 'min'),
+        max_hours=('total_hours', 'max'),
+    ).round(2).reset_index()
+
+
+def employee_summary(attendance_df):
+    return attendance_df.groupby('employee_id').agg(
+        days_present=('date', 'nunique'),
+        total_hours=('total_hours', 'sum'),
+        avg_hours=('total_hours', 'mean'),
+        first_day=('date', 'min'),
+        last_day=('date', 'max'),
+    ).round(2).reset_index()
+
+
+def late_arrivals(attendance_df):
+    report = apply_rules(attendance_df)
+    report = report[report['late_minutes'] > 0]
+    return report[['employee_id', 'date', 'shift', 'scheduled_start', 'check_in', 'late_minutes']].reset_index(drop=True)
+
+
+def early_departures(attendance_df):
+    report = apply_rules(attendance_df)
+    report = report[report['early_minutes'] > 0]
+    return report[['employee_id', 'date', 'shift', 'scheduled_end', 'check_out', 'early_minutes']].reset_index(drop=True)
+
+
+def overtime(attendance_df):
+    report = apply_rules(attendance_df)
+    report = report[report['overtime_hours'] > 0]
+    return report[[
+        'employee_id', 'date', 'shift', 'holiday', 'total_hours', 'regular_hours', 'overtime_hours'
+    ]].reset_index(drop=True)
+
+
+def payroll_summary(attendance_df, pay_period=None):
+    return pay_period_summary(apply_rules(attendance_df), pay_period)
+
+
+def raw_attendance(attendance_df):
+    return attendance_df.reset_index(drop=True)
+
+
+REPORT_BUILDERS = {
+    "Daily Summary": daily_summary,
+    "Employee Summary": employee_summary,
+    "Late Arrivals": late_arrivals,
+    "Early Departures": early_departures,
+    "Overtime": overtime,
+    "Payroll Summary": payroll_summary,
+    "Raw Attendance": raw_attendance,
+}
+
+
+def build_report(attendance_df, report_type, **options):
+    """Build one of REPORT_TYPES as a flat DataFrame ready for display or export
+
+    ``options`` are passed to the report builder, e.g. pay_period for the
+    Payroll Summary.
+    """
+    if report_type not in REPORT_BUILDERS:
+        raise Exception(f"Unknown report type: {report_type}")
+    return REPORT_BUILDERS[report_type](attendance_df, **options)
@@ -0,0 +1,206 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+DEFAULT_SHIFT = "default"
+PAY_PERIODS = ["weekly", "biweekly", "semimonthly", "monthly"]
+
+
+def _minutes(hhmm):
+    """Minutes after midnight of an HH:MM time"""
+    hours, minutes = (int(part) for part in hhmm.split(":"))
+    return hours * 60 + minutes
+
+
+def _workday_mask(days):
+    """Bit mask of working weekdays (bit 0 = Monday) from "0,1,2" or a list"""
+    if isinstance(days, str):
+        days = [day for day in days.split(",") if day.strip()]
+    mask = 0
+    for day in days:
+        mask |= 1 << int(day)
+    return mask
+
+
+def load_shift_schedule(path=None):
+    """Shift table and per-employee shift assignments
+
+    Returns (shifts, assignments): ``shifts`` is a DataFrame indexed by shift
+    name with start/end minutes after midnight and a workday bit mask, and
+    ``assignments`` maps badge IDs to shift names. The default shift comes from
+    SHIFT_START, SHIFT_END and SHIFT_WORKDAYS; SHIFTS_FILE adds or overrides
+    shifts, e.g. {"shifts": {"night": {"start": "22:00", "end": "06:00",
+    "workdays": [0, 1, 2, 3, 4]}}, "employees": {"1001": "night"}}.
+    """
+    path = Config.SHIFTS_FILE if path is None else path
+    shifts = {DEFAULT_SHIFT: {"start": Config.SHIFT_START, "end": Config.SHIFT_END}}
+    assignments = {}
+    if path:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise Exception(f"Could not read shift schedule {path}: {str(e)}")
+        shifts.update(data.get("shifts", {}))
+        assignments = {str(badge_id): name for badge_id, name in data.get("employees", {}).items()}
+    unknown = set(assignments.values()) - set(shifts)
+    if unknown:
+        raise Exception(f"Unknown shifts in schedule: {', '.join(sorted(unknown))}")
+    table = pd.DataFrame([{
+        "shift": name,
+        "start_minutes": _minutes(shift["start"]),
+        "end_minutes": _minutes(shift["end"]),
+        "workdays": _workday_mask(shift.get("workdays", Config.SHIFT_WORKDAYS)),
+    } for name, shift in shifts.items()]).set_index("shift")
+    return table, assignments
+
+
+def load_holidays(path=None):
+    """Holiday dates from HOLIDAYS_FILE as a DatetimeIndex"""
+    path = Config.HOLIDAYS_FILE if path is None else path
+    if not path:
+        return pd.DatetimeIndex([])
+    try:
+        dates = pd.read_csv(path, header=None, comment="#", usecols=[0], dtype=str)[0].str.strip()
+    except (OSError, ValueError) as e:
+        raise Exception(f"Could not read holidays {path}: {str(e)}")
+    dates = pd.to_datetime(dates[dates.str.lower() != "date"], errors="coerce").dropna()
+    return pd.DatetimeIndex(dates).normalize().unique()
+
+
+def assign_shift_dates(punches, shifts=None, assignments=None):
+    """Date each punch by the day its shift started
+
+    Employees on an overnight shift (one that ends at or before its start
+    time) have their punches moved to the previous day up to halfway through
+    the off-duty gap, so a 22:00 C/In and the next morning's 06:00 C/Out land
+    on the same day and pair. Everyone else keeps calendar dates.
+    """
+    if shifts is None:
+        shifts, configured = load_shift_schedule()
+        assignments = configured if assignments is None else assignments
+    assignments = assignments or {}
+    overnight = shifts[shifts['end_minutes'] <= shifts['start_minutes']]
+    if overnight.empty or punches.empty:
+        return punches
+
+    shift = punches['AC-No.'].astype(str).map(assignments)
+    on_overnight = shift.isin(overnight.index)
+    if not on_overnight.any():
+        return punches
+    rules = overnight.reindex(shift[on_overnight])
+    start_minutes = rules['start_minutes'].to_numpy()
+    cutoff = start_minutes - (start_minutes - rules['end_minutes'].to_numpy()) / 2
+    shifted = punches.loc[on_overnight, 'Time'] - pd.to_timedelta(cutoff, unit='m')
+    punches = punches.copy()
+    punches.loc[on_overnight, 'Date'] = shifted.dt.date.to_numpy()
+    return punches
+
+
+def apply_rules(attendance_df, shifts=None, assignments=None, holidays=None, weekly_regular_hours=None):
+    """Schedule, lateness and regular/overtime split for each attendance day
+
+    Adds shift, scheduled_start, scheduled_end, workday, holiday, late_minutes,
+    early_minutes, regular_hours and overtime_hours to paired attendance (as
+    returned by process_excel_file). Hours up to the shift length on a working
+    day are regular until the employee's weekly total passes
+    WEEKLY_REGULAR_HOURS; everything else, including hours on days off and
+    holidays, is overtime. Every step is a column operation, so the cost does
+    not grow with the number of employees beyond the row count.
+    """
+    if shifts is None:
+        shifts, configured = load_shift_schedule()
+        assignments = configured if assignments is None else assignments
+    assignments = assignments or {}
+    holidays = load_holidays() if holidays is None else pd.DatetimeIndex(pd.to_datetime(holidays)).normalize()
+    weekly_cap = Config.WEEKLY_REGULAR_HOURS if weekly_regular_hours is None else weekly_regular_hours
+
+    df = attendance_df.sort_values(['employee_id', 'date'], kind='stable').reset_index(drop=True)
+    day = pd.to_datetime(df['date'])
+    shift = df['employee_id'].astype(str).map(assignments).fillna(DEFAULT_SHIFT)
+    rules = shifts.reindex(shift)
+    start_minutes = rules['start_minutes'].to_numpy()
+    # Shifts ending at or before their start time end on the next day
+    end_minutes = rules['end_minutes'].to_numpy()
+    end_minutes = end_minutes + np.where(end_minutes <= start_minutes, 24 * 60, 0)
+    scheduled_start = day + pd.to_timedelta(start_minutes, unit='m')
+    scheduled_end = day + pd.to_timedelta(end_minutes, unit='m')
+    scheduled_hours = (end_minutes - start_minutes) / 60
+
+    holiday = day.isin(holidays).to_numpy()
+    on_schedule = (rules['workdays'].to_numpy() >> day.dt.weekday.to_numpy()) & 1
+    workday = on_schedule.astype(bool) & ~holiday
+
+    late = (df['check_in'] - scheduled_start).dt.total_seconds() / 60
+    late = late.where(workday & (late > Config.LATE_GRACE_MINUTES), 0.0)
+    early = (scheduled_end - df['check_out']).dt.total_seconds() / 60
+    early = early.where(workday & (early > Config.EARLY_GRACE_MINUTES), 0.0)
+
+    worked = df['total_hours'].to_numpy()
+    regular = np.where(workday, np.minimum(worked, scheduled_hours), 0.0)
+    if weekly_cap:
+        week = day - pd.to_timedelta(day.dt.weekday, unit='D')
+        week_total = pd.Series(regular).groupby([df['employee_id'], week]).cumsum().to_numpy()
+        regular = regular - np.clip(week_total - weekly_cap, 0, regular)
+
+    return df.assign(
+        shift=shift.to_numpy(),
+        scheduled_start=scheduled_start,
+        scheduled_end=scheduled_end,
+        workday=workday,
+        holiday=holiday,
+        late_minutes=late.round(1),
+        early_minutes=early.round(1),
+        regular_hours=regular.round(2),
+        overtime_hours=(worked - regular).round(2),
+    )
+
+
+def pay_period_bounds(dates, pay_period=None, anchor=None):
+    """First and last day of the pay period containing each date"""
+    pay_period = pay_period or Config.PAY_PERIOD
+    dates = pd.to_datetime(pd.Series(dates)).dt.normalize()
+    month_start = dates.dt.to_period('M').dt.to_timestamp()
+    month_end = dates.dt.to_period('M').dt.end_time.dt.normalize()
+    if pay_period == "weekly":
+        start = dates - pd.to_timedelta(dates.dt.weekday, unit='D')
+        end = start + pd.Timedelta(days=6)
+    elif pay_period == "biweekly":
+        anchor = pd.Timestamp(anchor or Config.PAY_PERIOD_ANCHOR)
+        start = anchor + pd.to_timedelta((dates - anchor).dt.days // 14 * 14, unit='D')
+        end = start + pd.Timedelta(days=13)
+    elif pay_period == "semimonthly":
+        second_half = dates.dt.day > 15
+        start = month_start.where(~second_half, month_start + pd.Timedelta(days=15))
+        end = (month_start + pd.Timedelta(days=14)).where(~second_half, month_end)
+    elif pay_period == "monthly":
+        start, end = month_start, month_end
+    else:
+        raise Exception(f"Unknown pay period: {pay_period}")
+    return start, end
+
+
+def pay_period_summary(rules_df, pay_period=None, anchor=None):
+    """Per-employee totals for each pay period from apply_rules output"""
+    start, end = pay_period_bounds(rules_df['date'], pay_period, anchor)
+    periods = rules_df.assign(
+        period_start=start.dt.date.to_numpy(),
+        period_end=end.dt.date.to_numpy(),
+        late=rules_df['late_minutes'] > 0,
+        early=rules_df['early_minutes'] > 0,
+        holiday_hours=rules_df['total_hours'].where(rules_df['holiday'], 0.0),
+    )
+    return periods.groupby(['employee_id', 'period_start', 'period_end']).agg(
+        days_worked=('date', 'nunique'),
+        worked_hours=('total_hours', 'sum'),
+        regular_hours=('regular_hours', 'sum'),
+        overtime_hours=('overtime_hours', 'sum'),
+        holiday_hours=('holiday_hours', 'sum'),
+        late_days=('late', 'sum'),
+        late_minutes=('late_minutes', 'sum'),
+        early_days=('early', 'sum'),
+        early_minutes=('early_minutes', 'sum'),
+    ).round(2).reset_index()
@@ -0,0 +1,111 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCache:
+    """Authenticated Odoo sessions keyed by (url, db, user) and the user's credential
+
+    Sessions are always kept in memory for the life of the process. With a
+    ``path`` and a Fernet ``key`` they are also written to disk, encrypted, so
+    a restarted process can reuse them; without ``cryptography`` or a key the
+    cache stays memory-only rather than writing session cookies in clear text.
+    Entries are keyed by an HMAC of the password/API key, so a session is only
+    handed to a caller that knows the credential it was opened with.
+    """
+
+    def __init__(self, path=None, key=None):
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._fernet = None
+        # Key of the credential HMAC: derived from the encryption key so entries
+        # on disk stay usable after a restart, random for memory-only caches
+        self._digest_key = os.urandom(32)
+        self.path = path or None
+        if self.path:
+            self._fernet = self._load_fernet(key)
+            if self._fernet is None:
+                self.path = None
+            else:
+                key = key.encode() if isinstance(key, str) else key
+                self._digest_key = hashlib.sha256(b"odoo-session-cache\0" + key).digest()
+                self._sessions = self._read()
+
+    @staticmethod
+    def _load_fernet(key):
+        if not key:
+            logger.warning("SESSION_CACHE_KEY is not set; Odoo sessions are cached in memory only")
+            return None
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            logger.warning("cryptography is not installed; Odoo sessions are cached in memory only")
+            return None
+        try:
+            return Fernet(key.encode() if isinstance(key, str) else key)
+        except ValueError as e:
+            logger.warning("Invalid SESSION_CACHE_KEY (%s); Odoo sessions are cached in memory only", e)
+            return None
+
+    def cache_key(self, url, db, user, secret):
+        message = f"{url.rstrip('/')}\0{db}\0{user}\0{secret}".encode()
+        return hmac.new(self._digest_key, message, hashlib.sha256).hexdigest()
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return json.loads(self._fernet.decrypt(f.read()))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning("Ignoring unreadable session cache %s: %s", self.path, e)
+            return {}
+
+    def _write(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self._fernet.encrypt(json.dumps(self._sessions).encode()))
+        os.replace(tmp_path, self.path)
+
+    def get(self, url, db, user, secret):
+        """The cached {session_id, uid, saved_at} for a connection and credential, or None"""
+        with self._lock:
+            return self._sessions.get(self.cache_key(url, db, user, secret))
+
+    def set(self, url, db, user, secret, session_id, uid):
+        with self._lock:
+            self._sessions[self.cache_key(url, db, user, secret)] = {
+                "session_id": session_id,
+                "uid": uid,
+                "saved_at": time.time(),
+            }
+            self._write()
+
+    def invalidate(self, url, db, user, secret):
+        with self._lock:
+            if self._sessions.pop(self.cache_key(url, db, user, secret), None) is not None:
+                self._write()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_session_cache():
+    """The process-wide cache configured by SESSION_CACHE_FILE/SESSION_CACHE_KEY"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SessionCache(Config.SESSION_CACHE_FILE, Config.SESSION_CACHE_KEY)
+        return _default_cache
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+
+from config import Config
+
+# Modules that must never be imported just to render the login page
+HEAVY_MODULES = ["pandas", "matplotlib", "plotly", "openpyxl", "requests"]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _import_timings(module, python):
+    """Cumulative import time in ms of every module pulled in by ``import module``"""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise Exception(f"Error importing {module}: {result.stderr.strip().splitlines()[-1]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        timings[name] = int(cumulative_us) / 1000
+    return timings
+
+
+def measure_import_time(module="app.main", baseline="streamlit", python=sys.executable):
+    """Import a module in a fresh interpreter and return its import-time breakdown
+
+    ``heavy_modules`` only lists heavy modules that a bare ``import baseline``
+    does not already load: streamlit imports plotly itself, and the app
+    cannot render its login page without streamlit.
+    """
+    timings = _import_timings(module, python)
+    preloaded = _import_timings(baseline, python) if baseline else {}
+
+    top_level = [name for name in timings if "." not in name]
+    return {
+        "module": module,
+        "total_ms": timings.get(module, sum(timings[name] for name in top_level)),
+        "baseline_ms": preloaded.get(baseline, 0.0),
+        "modules": sorted(timings.items(), key=lambda item: item[1], reverse=True),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in timings and name not in preloaded],
+    }
+
+
+def check_cold_start(module="app.main", budget_ms=None):
+    """Return a list of cold start regressions for the given module (empty when OK)"""
+    budget_ms = Config.COLD_START_BUDGET_MS if budget_ms is None else budget_ms
+    report = measure_import_time(module)
+    problems = []
+    if report["heavy_modules"]:
+        problems.append(f"{module} eagerly imports: {', '.join(report['heavy_modules'])}")
+    if report["total_ms"] > budget_ms:
+        problems.append(f"{module} takes {report['total_ms']:.1f}ms to import (budget {budget_ms}ms)")
+    return report, problems
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    module = argv[0] if argv else "app.main"
+    report, problems = check_cold_start(module)
+
+    print(f"Import time for {module}: {report['total_ms']:.1f}ms (streamlit alone: {report['baseline_ms']:.1f}ms)")
+    print("Slowest imports:")
+    for name, cumulative_ms in report["modules"][:15]:
+        print(f"  {cumulative_ms:9.1f}ms  {name}")
+
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+from config import Config
+from .profiling import stage
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS punches (
+    employee_id TEXT NOT NULL,
+    punch_time TEXT NOT NULL,
+    state TEXT NOT NULL,
+    date TEXT NOT NULL,
+    source TEXT,
+    PRIMARY KEY (employee_id, punch_time, state)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_punches_employee_date ON punches (employee_id, date);
+
+CREATE TABLE IF NOT EXISTS attendances (
+    employee_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    check_in TEXT NOT NULL,
+    check_out TEXT NOT NULL,
+    total_hours REAL NOT NULL,
+    PRIMARY KEY (employee_id, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_attendances_date ON attendances (date, employee_id);
+
+CREATE TABLE IF NOT EXISTS odoo_attendances (
+    odoo_id INTEGER PRIMARY KEY,
+    odoo_employee_id INTEGER,
+    employee_id TEXT,
+    date TEXT NOT NULL,
+    check_in TEXT NOT NULL,
+    check_out TEXT,
+    worked_hours REAL,
+    write_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_odoo_attendances_employee_date ON odoo_attendances (employee_id, date);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class AttendanceStore:
+    """Embedded SQLite store of raw punches and paired attendances
+
+    Punches are keyed by (employee, time, state) so re-importing an export is
+    idempotent. After each import the attendances of every (employee, day)
+    it touched are recomputed from all stored punches, so a day split across
+    several exports still pairs its first C/In with its last C/Out.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.ATTENDANCE_DB
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    @stage("store import")
+    def import_punches(self, punches, source=None):
+        """Upsert a normalized punch table and refresh the affected attendances
+
+        Returns the number of punches that were not stored yet.
+        """
+        if punches.empty:
+            return 0
+        rows = pd.DataFrame({
+            'employee_id': punches['AC-No.'].astype(str),
+            'punch_time': punches['Time'].dt.strftime(TIME_FORMAT),
+            'state': punches['State'].astype(str),
+            # Date, not the calendar day of Time: overnight shifts are dated by their start
+            'date': pd.to_datetime(punches['Date']).dt.strftime('%Y-%m-%d'),
+        })
+        rows['source'] = source
+        days = rows[['employee_id', 'date']].drop_duplicates()
+
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT INTO punches (employee_id, punch_time, state, date, source) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (employee_id, punch_time, state) DO NOTHING",
+                rows.itertuples(index=False, name=None)
+            )
+            inserted = self.connection.total_changes - before
+            self._refresh_attendances(days)
+        return inserted
+
+    def _refresh_attendances(self, days):
+        """Re-pair the given (employee_id, date) days from their stored punches"""
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS touched_days (employee_id TEXT, date TEXT)")
+        self.connection.execute("DELETE FROM touched_days")
+        self.connection.executemany(
+            "INSERT INTO touched_days VALUES (?, ?)",
+            days.itertuples(index=False, name=None)
+        )
+        self.connection.execute("""
+            INSERT INTO attendances (employee_id, date, check_in, check_out, total_hours)
+            SELECT * FROM (
+                SELECT p.employee_id, p.date,
+                       MIN(CASE WHEN p.state = 'C/In' THEN p.punch_time END) AS check_in,
+                       MAX(CASE WHEN p.state = 'C/Out' THEN p.punch_time END) AS check_out,
+                       (strftime('%s', MAX(CASE WHEN p.state = 'C/Out' THEN p.punch_time END))
+                        - strftime('%s', MIN(CASE WHEN p.state = 'C/In' THEN p.punch_time END))) / 3600.0
+                FROM punches p
+                JOIN touched_days t ON t.employee_id = p.employee_id AND t.date = p.date
+                GROUP BY p.employee_id, p.date
+            ) WHERE check_in IS NOT NULL AND check_out IS NOT NULL AND check_in < check_out
+            ON CONFLICT (employee_id, date) DO UPDATE SET
+                check_in = excluded.check_in,
+                check_out = excluded.check_out,
+                total_hours = excluded.total_hours
+        """)
+
+    def upsert_attendances(self, attendance_df):
+        """Insert or replace paired attendance records (employee_id, date, check_in, check_out)"""
+        if attendance_df.empty:
+            return 0
+        rows = pd.DataFrame({
+            'employee_id': attendance_df['employee_id'].astype(str),
+            'date': pd.to_datetime(attendance_df['date']).dt.strftime('%Y-%m-%d'),
+            'check_in': attendance_df['check_in'].dt.strftime(TIME_FORMAT),
+            'check_out': attendance_df['check_out'].dt.strftime(TIME_FORMAT),
+            'total_hours': attendance_df['total_hours'].astype(float),
+        })
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO attendances (employee_id, date, check_in, check_out, total_hours) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (employee_id, date) DO UPDATE SET "
+                "check_in = excluded.check_in, check_out = excluded.check_out, total_hours = excluded.total_hours",
+                rows.itertuples(index=False, name=None)
+            )
+        return len(rows)
+
+    def _read(self, sql, params=()):
+        with self.lock:
+            return pd.read_sql_query(sql, self.connection, params=params)
+
+    def has_data(self):
+        return not self._read("SELECT 1 FROM attendances LIMIT 1").empty
+
+    def employees(self):
+        return self._read("SELECT DISTINCT employee_id FROM attendances ORDER BY employee_id")['employee_id'].tolist()
+
+    def date_bounds(self):
+        """(first date, last date) of the stored attendances, or (None, None)"""
+        bounds = self._read("SELECT MIN(date) AS first, MAX(date) AS last FROM attendances").iloc[0]
+        if bounds['first'] is None:
+            return None, None
+        return pd.Timestamp(bounds['first']).date(), pd.Timestamp(bounds['last']).date()
+
+    @staticmethod
+    def _where(employees=None, start=None, end=None):
+        clauses, params = [], []
+        if employees:
+            clauses.append(f"employee_id IN ({', '.join('?' * len(employees))})")
+            params.extend(str(employee) for employee in employees)
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @stage("store query")
+    def query_attendance(self, employees=None, start=None, end=None):
+        """Attendance records for the given employees and date range, as in process_excel_file"""
+        where, params = self._where(employees, start, end)
+        df = self._read(
+            "SELECT employee_id, date, check_in, check_out, total_hours FROM attendances"
+            f"{where} ORDER BY employee_id, date",
+            params
+        )
+        df['date'] = pd.to_datetime(df['date']).dt.date
+        df['check_in'] = pd.to_datetime(df['check_in'], format=TIME_FORMAT)
+        df['check_out'] = pd.to_datetime(df['check_out'], format=TIME_FORMAT)
+        return df
+
+    def get_sync_value(self, key, default=None):
+        rows = self._read("SELECT value FROM sync_state WHERE key = ?", (key,))
+        return rows['value'].iloc[0] if not rows.empty else default
+
+    def set_sync_value(self, key, value):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, str(value))
+            )
+
+    def upsert_odoo_attendances(self, rows):
+        """Insert or replace attendance rows pulled from Odoo
+
+        ``rows`` are dicts with odoo_id, odoo_employee_id, employee_id (badge),
+        check_in, check_out, worked_hours and write_date as Odoo strings.
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO odoo_attendances "
+                "(odoo_id, odoo_employee_id, employee_id, date, check_in, check_out, worked_hours, write_date) "
+                "VALUES (:odoo_id, :odoo_employee_id, :employee_id, substr(:check_in, 1, 10), "
+                ":check_in, :check_out, :worked_hours, :write_date) "
+                "ON CONFLICT (odoo_id) DO UPDATE SET "
+                "odoo_employee_id = excluded.odoo_employee_id, employee_id = excluded.employee_id, "
+                "date = excluded.date, check_in = excluded.check_in, check_out = excluded.check_out, "
+                "worked_hours = excluded.worked_hours, write_date = excluded.write_date",
+                rows
+            )
+        return len(rows)
+
+    @stage("store query")
+    def query_odoo_attendance(self, start=None, end=None):
+        """Pulled Odoo attendances folded per (badge, day): first check-in, last check-out"""
+        where, params = self._where(start=start, end=end)
+        df = self._read(
+            "SELECT employee_id, date, MIN(check_in) AS odoo_check_in, MAX(check_out) AS odoo_check_out, "
+            "COUNT(*) AS odoo_records, GROUP_CONCAT(odoo_id) AS odoo_ids "
+            f"FROM odoo_attendances{where} GROUP BY employee_id, date",
+            params
+        )
+        df['date'] = pd.to_datetime(df['date']).dt.date
+        df['odoo_check_in'] = pd.to_datetime(df['odoo_check_in'], format=TIME_FORMAT)
+        df['odoo_check_out'] = pd.to_datetime(df['odoo_check_out'], format=TIME_FORMAT)
+        return df
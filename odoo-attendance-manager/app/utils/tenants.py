@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` calls per second with bursts up to ``burst``"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class Tenant:
+    """One company's Odoo database with its own connection pool, employee cache and rate limit
+
+    Upload jobs are built per run (attendance_jobs, WatchIngestor.plan_sync)
+    and handed to MultiTenantSync; ``sync_lock`` keeps one job per tenant in
+    flight even when several runs, e.g. two browser sessions, overlap.
+    """
+
+    def __init__(self, name, url, db, username, password, api_key="", rate_limit=None,
+                 pool_size=None, watch_dir=None, attendance_db=None):
+        self.name = name
+        self.url = url
+        self.db = db
+        self.username = username
+        self.password = password
+        self.api_key = api_key
+        self.pool_size = pool_size or Config.TENANT_POOL_SIZE
+        self.rate_limiter = RateLimiter(Config.TENANT_RATE_LIMIT if rate_limit is None else rate_limit)
+        self.watch_dir = watch_dir
+        self.attendance_db = attendance_db or f"attendance_{self.slug}.db"
+        self.employee_ids = {}
+        self.sync_lock = threading.Lock()
+        self._odoo = None
+        self._lock = threading.Lock()
+
+    @property
+    def slug(self):
+        return re.sub(r"[^a-z0-9]+", "_", self.name.lower()).strip("_")
+
+    @classmethod
+    def from_dict(cls, data):
+        password = data.get("password")
+        if not password and data.get("password_env"):
+            password = os.getenv(data["password_env"], "")
+        missing = [key for key in ("name", "url", "db", "username") if not data.get(key)]
+        if missing:
+            raise Exception(f"Tenant {data.get('name', '?')} is missing: {', '.join(missing)}")
+        return cls(
+            data["name"], data["url"], data["db"], data["username"], password,
+            api_key=data.get("api_key", ""),
+            rate_limit=data.get("rate_limit"),
+            pool_size=data.get("pool_size"),
+            watch_dir=data.get("watch_dir"),
+            attendance_db=data.get("attendance_db"),
+        )
+
+    @property
+    def odoo(self):
+        """This tenant's OdooAPI, connected on first use"""
+        with self._lock:
+            if self._odoo is None:
+                from .odoo_api import OdooAPI
+
+                self._odoo = OdooAPI(
+                    url=self.url, db=self.db, username=self.username, password=self.password,
+                    api_key=self.api_key, pool_size=self.pool_size, rate_limiter=self.rate_limiter
+                )
+            return self._odoo
+
+    def resolve_employees(self, badge_ids):
+        """Badge -> employee ID map for this tenant, looking up only uncached badges"""
+        missing = [str(badge_id) for badge_id in set(badge_ids) if str(badge_id) not in self.employee_ids]
+        if missing:
+            self.employee_ids.update(self.odoo.get_employee_ids(missing))
+        return {str(badge_id): self.employee_ids.get(str(badge_id)) for badge_id in badge_ids}
+
+    def attendance_jobs(self, attendance_df, batch_size=None):
+        """Batched create jobs for paired attendance records
+
+        Returns (jobs, unknown) where ``unknown`` lists the badges with no
+        employee in this tenant's Odoo.
+        """
+        batch_size = batch_size or Config.UPLOAD_BATCH_SIZE
+        from .odoo_api import attendance_payloads
+
+        employee_ids = self.resolve_employees(attendance_df['employee_id'].unique())
+        resolved = attendance_df['employee_id'].astype(str).map(employee_ids)
+        known = resolved.notna()
+        # Build every record's values up front, column-wise, then cut them into batches
+        values = attendance_payloads(attendance_df.loc[known, ['check_in', 'check_out']].assign(employee_id=resolved[known]))
+        jobs = [self._create_job(values[start:start + batch_size]) for start in range(0, len(values), batch_size)]
+        return jobs, sorted(badge_id for badge_id, employee_id in employee_ids.items() if not employee_id)
+
+    def _create_job(self, values):
+        def job():
+            # Records of a batch Odoo refuses are retried one by one; connection
+            # and login errors fail the job so MultiTenantSync stops the tenant
+            rejected = 0
+            for _, error in self.odoo.create_attendance_values_each(values):
+                if error:
+                    rejected += 1
+                    logger.warning("[%s] Odoo rejected an attendance: %s", self.name, error)
+            return {"created": len(values) - rejected, "rejected": rejected}
+        return job
+
+
+class TenantRegistry:
+    """Tenants loaded from the TENANTS_FILE JSON list"""
+
+    def __init__(self, tenants=None):
+        self.tenants = {tenant.name: tenant for tenant in tenants or []}
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or Config.TENANTS_FILE
+        if not path:
+            return cls()
+        if not os.path.exists(path):
+            raise Exception(f"Tenants file not found: {path}")
+        with open(path) as f:
+            return cls([Tenant.from_dict(data) for data in json.load(f)])
+
+    def __bool__(self):
+        return bool(self.tenants)
+
+    def __iter__(self):
+        return iter(self.tenants.values())
+
+    def names(self):
+        return list(self.tenants)
+
+    def get(self, name):
+        if name not in self.tenants:
+            raise Exception(f"Unknown tenant: {name}")
+        return self.tenants[name]
+
+
+class MultiTenantSync:
+    """Runs the jobs of several tenants concurrently and fairly
+
+    ``jobs`` maps each tenant to this run's callables, each sending one Odoo
+    request (or one batch). A run only drains its own jobs, so concurrent runs
+    for the same tenant never see each other's work or results. Each tenant
+    has at most one job in flight, across runs too, and tenants with more work
+    go to the back of a round-robin line after each job, so a tenant with a
+    huge queue gets one worker's share instead of all of them. Per-tenant rate
+    limits are applied by each tenant's OdooAPI. A job that fails (Odoo could
+    not be reached or refused the login) stops its tenant for this run: the
+    rest of its jobs are dropped and counted as deferred, since they would
+    fail the same way.
+    """
+
+    def __init__(self, jobs, max_workers=None):
+        self.jobs = dict(jobs)
+        self.max_workers = max_workers or Config.TENANT_WORKERS
+
+    @staticmethod
+    def _run_job(tenant, job):
+        with tenant.sync_lock:
+            return job()
+
+    def run(self):
+        """Run every tenant's jobs; returns per-tenant counters and errors"""
+        queues = {tenant: deque(jobs) for tenant, jobs in self.jobs.items()}
+        results = {tenant.name: {"jobs": 0, "failed": 0, "deferred": 0, "errors": []} for tenant in queues}
+        ready = deque(tenant for tenant, queue in queues.items() if queue)
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tenant-sync") as pool:
+            while ready or in_flight:
+                while ready and len(in_flight) < self.max_workers:
+                    tenant = ready.popleft()
+                    in_flight[pool.submit(self._run_job, tenant, queues[tenant].popleft())] = tenant
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tenant = in_flight.pop(future)
+                    result = results[tenant.name]
+                    result["jobs"] += 1
+                    try:
+                        for key, count in (future.result() or {}).items():
+                            result[key] = result.get(key, 0) + count
+                    except Exception as e:
+                        result["failed"] += 1
+                        result["errors"].append(str(e))
+                        result["deferred"] += len(queues[tenant])
+                        queues[tenant].clear()
+                        logger.error("[%s] %s", tenant.name, e)
+                    if queues[tenant]:
+                        ready.append(tenant)
+        return results
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from dateutil import tz
+
+from config import Config
+
+ODOO_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def local_timezone():
+    """Timezone of the terminals' local times: TIMEZONE, or the system's own"""
+    return Config.TIMEZONE or tz.tzlocal()
+
+
+def to_utc_strings(values, timezone=None):
+    """Format local timestamps as Odoo's naive UTC datetime strings
+
+    Naive values are taken to be in ``timezone`` (TIMEZONE by default); missing
+    values become False, which Odoo reads as an empty datetime.
+    """
+    values = pd.to_datetime(pd.Series(values).reset_index(drop=True))
+    if values.dt.tz is None:
+        # Times repeated when clocks go back are read as standard time
+        values = values.dt.tz_localize(
+            timezone or local_timezone(),
+            ambiguous=np.zeros(len(values), dtype=bool),
+            nonexistent='shift_forward'
+        )
+    utc = values.dt.tz_convert('UTC').dt.tz_localize(None)
+    # datetime_as_string formats the whole array in C, much faster than strftime
+    formatted = pd.Series(np.datetime_as_string(utc.to_numpy(), unit='s'), dtype=object).str.replace('T', ' ', regex=False)
+    return formatted.where(utc.notna(), False)
+
+
+def to_utc_string(value, timezone=None):
+    """to_utc_strings for a single timestamp"""
+    return to_utc_strings([value], timezone).iloc[0]
+
+
+def to_local_strings(values, timezone=None):
+    """Convert Odoo UTC datetime strings to local ones; missing values become None"""
+    # Odoo sends False for empty datetimes
+    values = pd.to_datetime(pd.Series([value or None for value in values], dtype=object), format=ODOO_DATETIME_FORMAT)
+    local = values.dt.tz_localize('UTC').dt.tz_convert(timezone or local_timezone()).dt.tz_localize(None)
+    return local.dt.strftime(ODOO_DATETIME_FORMAT).astype(object).where(local.notna(), None)
@@ -0,0 +1,332 @@
+import fnmatch
+import json
+import logging
+import os
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from config import Config
+from .cleaning import debounce_punches
+from .data_processor import read_punches, summarize_punch_days
+from .readers import read_csv_tail, sniff_format
+from .rules import assign_shift_dates
+
+logger = logging.getLogger(__name__)
+
+
+class FolderWatcher:
+    """Reports export files in a directory that are new or have grown
+
+    Uses inotify (through the optional ``inotify_simple`` package) to wake up
+    as soon as a file is closed after writing, and falls back to polling every
+    ``interval`` seconds. Without inotify a file is only reported once its
+    size and mtime are unchanged between two scans, so half-written exports
+    are not picked up; pass ``settle=False`` to report changed files at once.
+    """
+
+    def __init__(self, directory, patterns=None, interval=None, settle=True):
+        self.directory = os.path.abspath(directory)
+        if not os.path.isdir(self.directory):
+            raise Exception(f"Watch directory not found: {self.directory}")
+        patterns = patterns or Config.WATCH_PATTERNS
+        self.patterns = [p.strip() for p in patterns.split(",")] if isinstance(patterns, str) else list(patterns)
+        self.interval = Config.WATCH_INTERVAL if interval is None else interval
+        self.settle = settle
+        self._previous_scan = {}
+        self._closed = set()
+        self._inotify = self._open_inotify()
+
+    def _open_inotify(self):
+        try:
+            from inotify_simple import INotify, flags
+        except ImportError:
+            logger.info("inotify_simple not installed, polling %s every %ss", self.directory, self.interval)
+            return None
+        try:
+            inotify = INotify()
+            inotify.add_watch(self.directory, flags.CLOSE_WRITE | flags.MOVED_TO)
+            return inotify
+        except OSError as e:
+            logger.warning("inotify unavailable (%s), falling back to polling", e)
+            return None
+
+    @property
+    def uses_inotify(self):
+        return self._inotify is not None
+
+    def _matches(self, name):
+        return not name.startswith(".") and any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+    def scan(self):
+        """Return {path: (size, mtime)} for every matching file in the directory"""
+        files = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and self._matches(entry.name):
+                stat = entry.stat()
+                files[entry.path] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def ready_files(self, processed):
+        """Paths whose (size, mtime) differs from ``processed`` and are done being written"""
+        current = self.scan()
+        ready = []
+        for path, signature in sorted(current.items()):
+            if tuple(processed.get(path, ())) == signature:
+                continue
+            if not self.settle or path in self._closed or self._previous_scan.get(path) == signature:
+                ready.append(path)
+        self._previous_scan = current
+        self._closed.clear()
+        return ready
+
+    def wait(self, timeout=None):
+        """Block until something may have changed in the directory
+
+        ``timeout`` defaults to the polling interval; 0 only drains pending
+        inotify events.
+        """
+        timeout = self.interval if timeout is None else timeout
+        if self._inotify is None:
+            time.sleep(timeout)
+            return
+        for event in self._inotify.read(timeout=int(timeout * 1000)):
+            if self._matches(event.name):
+                self._closed.add(os.path.join(self.directory, event.name))
+
+
+class WatchIngestor:
+    """Feeds new punches from watched exports into Odoo attendance records
+
+    Per file, only punches appended since the last read are processed; text
+    exports are read from the last byte offset. Punches are folded into a
+    per-(employee, day) first check-in / last check-out summary, and only days
+    that changed are created or updated in Odoo, with creates sent in batches.
+    State is kept in a JSON file so a restart does not reprocess whole files.
+    When a store is given, new punches are also saved to the local attendance
+    history.
+    """
+
+    def __init__(self, odoo, state_file, batch_size=None, retention_days=None, store=None, employee_ids=None):
+        self.odoo = odoo
+        self.store = store
+        self.state_file = state_file
+        self.batch_size = batch_size or Config.UPLOAD_BATCH_SIZE
+        self.retention_days = Config.WATCH_RETENTION_DAYS if retention_days is None else retention_days
+        self.employee_ids = {} if employee_ids is None else employee_ids
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as f:
+                return json.load(f)
+        return {"files": {}, "days": {}}
+
+    def save_state(self):
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_file)
+
+    @property
+    def processed_signatures(self):
+        return {path: (info["size"], info["mtime"]) for path, info in self.state["files"].items()}
+
+    def ingest_file(self, path):
+        """Read the new punches of one export file and merge them; returns the punch count
+
+        Delimited text exports are read from the byte offset where the last
+        read stopped. Binary formats cannot be read from the middle, so they
+        are re-read and only rows beyond the last processed row count are new.
+        """
+        stat = os.stat(path)
+        file_state = self.state["files"].get(path, {"rows": 0})
+        start = file_state["rows"]
+
+        if sniff_format(path) == 'csv':
+            offset = file_state.get("offset", 0)
+            if stat.st_size < offset:
+                logger.info("%s shrank, reprocessing it from the start", path)
+                offset = start = 0
+            punches, offset = read_csv_tail(path, offset)
+            punches = assign_shift_dates(punches)
+            if "offset" not in file_state:
+                # State written before offsets were tracked only knows the row count
+                punches = punches.iloc[start:]
+            rows = start + len(punches)
+        else:
+            offset = None
+            punches = read_punches(path)
+            if len(punches) < start:
+                logger.info("%s shrank, reprocessing it from the start", path)
+                start = 0
+            rows = len(punches)
+            punches = punches.iloc[start:]
+
+        new_punches, _ = debounce_punches(punches)
+        self.merge_punches(new_punches)
+        if self.store is not None:
+            self.store.import_punches(new_punches, source=os.path.basename(path))
+
+        self.state["files"][path] = {"size": stat.st_size, "mtime": stat.st_mtime, "rows": rows}
+        if offset is not None:
+            self.state["files"][path]["offset"] = offset
+        return len(new_punches)
+
+    def merge_punches(self, punches):
+        """Fold punches into the per-day check-in/check-out summary"""
+        if punches.empty:
+            return
+        days = self.state["days"]
+        for row in summarize_punch_days(punches).itertuples(index=False):
+            key = f"{row.employee_id}|{row.date.isoformat()}"
+            day = days.setdefault(key, {"check_in": None, "check_out": None, "attendance_id": None, "synced": False, "error": None})
+            check_in = min(filter(None, [day["check_in"], None if pd.isna(row.check_in) else row.check_in.isoformat()]), default=None)
+            check_out = max(filter(None, [day["check_out"], None if pd.isna(row.check_out) else row.check_out.isoformat()]), default=None)
+            if (check_in, check_out) != (day["check_in"], day["check_out"]):
+                day.update(check_in=check_in, check_out=check_out, synced=False, error=None)
+
+    def _resolve_employees(self, badge_ids):
+        missing = [badge_id for badge_id in set(badge_ids) if badge_id not in self.employee_ids]
+        if missing:
+            self.employee_ids.update(self.odoo.get_employee_ids(missing))
+
+    def plan_sync(self):
+        """Build the Odoo upload jobs for every changed, complete day
+
+        Returns (jobs, skipped) where each job is a callable sending one Odoo
+        request (an update or a batch of creates) and marking its days synced.
+        Days Odoo rejected are left alone until new punches change them. A job
+        that cannot reach Odoo raises and leaves its days pending.
+        """
+        pending = []
+        for key, day in self.state["days"].items():
+            if day["synced"] or day.get("error") or not day["check_in"] or not day["check_out"]:
+                continue
+            if day["check_in"] >= day["check_out"]:
+                continue
+            pending.append((key, day))
+        if not pending:
+            return [], 0
+
+        self._resolve_employees([key.split("|")[0] for key, _ in pending])
+        jobs, to_create, skipped = [], [], 0
+        for key, day in pending:
+            employee_id = self.employee_ids.get(key.split("|")[0])
+            if not employee_id:
+                skipped += 1
+            elif day["attendance_id"]:
+                jobs.append(self._update_job(day))
+            else:
+                to_create.append((day, employee_id))
+
+        for start in range(0, len(to_create), self.batch_size):
+            jobs.append(self._create_job(to_create[start:start + self.batch_size]))
+
+        if skipped:
+            logger.warning("%s days skipped: employees not found in Odoo", skipped)
+        return jobs, skipped
+
+    @staticmethod
+    def _reject(day, error):
+        logger.warning("Odoo rejected attendance %s - %s: %s", day["check_in"], day["check_out"], error)
+        day["error"] = error
+
+    def _update_job(self, day):
+        def job():
+            from .odoo_api import OdooError
+
+            try:
+                self.odoo.update_attendance(
+                    day["attendance_id"],
+                    check_in=pd.Timestamp(day["check_in"]),
+                    check_out=pd.Timestamp(day["check_out"])
+                )
+            except OdooError as e:
+                self._reject(day, str(e))
+                return {"rejected": 1}
+            day["synced"] = True
+            return {"updated": 1}
+        return job
+
+    def _create_job(self, batch):
+        def job():
+            from .odoo_api import attendance_payloads
+
+            values = attendance_payloads(pd.DataFrame([
+                {
+                    "employee_id": employee_id,
+                    "check_in": pd.Timestamp(day["check_in"]),
+                    "check_out": pd.Timestamp(day["check_out"]),
+                }
+                for day, employee_id in batch
+            ]))
+            # A batch Odoo refuses is retried record by record, so one bad day
+            # cannot hold back the rest of its batch on every cycle; connection
+            # and login errors are raised before any day is marked
+            result = {"created": 0, "rejected": 0}
+            for (day, _), (attendance_id, error) in zip(batch, self.odoo.create_attendance_values_each(values)):
+                if error:
+                    self._reject(day, error)
+                    result["rejected"] += 1
+                else:
+                    day.update(attendance_id=attendance_id, synced=True, error=None)
+                    result["created"] += 1
+            return result
+        return job
+
+    def sync(self):
+        """Create or update Odoo attendances for every changed, complete day
+
+        Stops at the first job that cannot reach Odoo; its days and those of
+        the remaining jobs stay pending and are retried on the next cycle.
+        """
+        jobs, skipped = self.plan_sync()
+        result = {"created": 0, "updated": 0, "rejected": 0, "skipped": skipped, "deferred": 0}
+        for index, job in enumerate(jobs):
+            try:
+                counts = job()
+            except Exception as e:
+                result["deferred"] = len(jobs) - index
+                logger.error("Odoo unavailable, %s upload jobs left for the next cycle: %s", result["deferred"], e)
+                break
+            for key, count in counts.items():
+                result[key] += count
+            self.save_state()
+        return result
+
+    def has_unsynced_days(self):
+        return any(not day["synced"] for day in self.state["days"].values())
+
+    def ingest_ready_files(self, watcher):
+        """Ingest every file the watcher reports as ready; returns the new punch count"""
+        new_punches = 0
+        for path in watcher.ready_files(self.processed_signatures):
+            try:
+                count = self.ingest_file(path)
+                new_punches += count
+                logger.info("%s: %s new punches", os.path.basename(path), count)
+            except Exception as e:
+                logger.error("Error reading %s: %s", path, e)
+        return new_punches
+
+    def prune(self):
+        """Forget days older than the retention window, logging any never uploaded"""
+        cutoff = (date.today() - timedelta(days=self.retention_days)).isoformat()
+        kept = {}
+        for key, day in self.state["days"].items():
+            if key.split("|")[1] >= cutoff:
+                kept[key] = day
+            elif not day["synced"]:
+                logger.warning("Dropping %s: never uploaded (check_in=%s, check_out=%s)",
+                               key, day["check_in"], day["check_out"])
+        self.state["days"] = kept
+
+    def run_once(self, watcher):
+        """Ingest every ready file and sync the changes to Odoo"""
+        new_punches = self.ingest_ready_files(watcher)
+        result = self.sync() if new_punches or self.has_unsynced_days() else None
+        self.prune()
+        self.save_state()
+        return new_punches, result
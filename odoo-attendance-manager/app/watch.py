@@ -0,0 +1,125 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+from config import Config
+from .utils.odoo_api import OdooAPI
+from .utils.profiling import profile_run
+from .utils.store import AttendanceStore
+from .utils.tenants import MultiTenantSync, TenantRegistry
+from .utils.watcher import FolderWatcher, WatchIngestor
+
+logger = logging.getLogger(__name__)
+
+
+def run_watch(directory, interval=None, state_file=None, once=False):
+    """Watch a directory and sync new punches from terminal exports into Odoo"""
+    watcher = FolderWatcher(directory, interval=interval, settle=not once)
+    state_file = state_file or os.path.join(watcher.directory, ".attendance_watch.json")
+    ingestor = WatchIngestor(OdooAPI(), state_file, store=AttendanceStore())
+    logger.info(
+        "Watching %s for %s (%s)",
+        watcher.directory, ", ".join(watcher.patterns), "inotify" if watcher.uses_inotify else "polling"
+    )
+
+    while True:
+        try:
+            with profile_run("watch cycle"):
+                new_punches, result = ingestor.run_once(watcher)
+            if result:
+                logger.info(
+                    "%s new punches: %s created, %s updated, %s rejected, %s skipped, %s jobs deferred",
+                    new_punches, result["created"], result["updated"], result["rejected"], result["skipped"],
+                    result["deferred"]
+                )
+        except Exception as e:
+            logger.error("Sync failed: %s", e)
+        if once:
+            return
+        watcher.wait()
+
+
+def run_tenant_watch(registry, interval=None, once=False):
+    """Watch every tenant's folder and sync all tenants concurrently"""
+    interval = Config.WATCH_INTERVAL if interval is None else interval
+    pipelines = []
+    for tenant in registry:
+        if not tenant.watch_dir:
+            logger.warning("[%s] No watch_dir configured, skipping", tenant.name)
+            continue
+        try:
+            watcher = FolderWatcher(tenant.watch_dir, interval=interval, settle=not once)
+            ingestor = WatchIngestor(
+                tenant.odoo,
+                os.path.join(watcher.directory, ".attendance_watch.json"),
+                store=AttendanceStore(tenant.attendance_db),
+                employee_ids=tenant.employee_ids
+            )
+        except Exception as e:
+            logger.error("[%s] Could not start: %s", tenant.name, e)
+            continue
+        pipelines.append((tenant, watcher, ingestor))
+        logger.info("[%s] Watching %s", tenant.name, watcher.directory)
+
+    if not pipelines:
+        raise Exception("No tenant could be started")
+
+    while True:
+        with profile_run("tenant watch cycle"):
+            jobs = {}
+            for tenant, watcher, ingestor in pipelines:
+                try:
+                    new_punches = ingestor.ingest_ready_files(watcher)
+                    jobs[tenant], _ = ingestor.plan_sync()
+                    if new_punches or jobs[tenant]:
+                        logger.info("[%s] %s new punches, %s upload jobs planned", tenant.name, new_punches, len(jobs[tenant]))
+                except Exception as e:
+                    jobs[tenant] = []
+                    logger.error("[%s] Ingestion failed: %s", tenant.name, e)
+
+            results = MultiTenantSync(jobs).run()
+            for tenant, _, ingestor in pipelines:
+                ingestor.prune()
+                ingestor.save_state()
+                result = results[tenant.name]
+                if result["jobs"]:
+                    logger.info(
+                        "[%s] %s created, %s updated, %s rejected, %s failed and %s deferred jobs",
+                        tenant.name, result.get("created", 0), result.get("updated", 0),
+                        result.get("rejected", 0), result["failed"], result["deferred"]
+                    )
+        if once:
+            return
+        time.sleep(interval)
+        for _, watcher, _ in pipelines:
+            watcher.wait(timeout=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Continuously import attendance exports from a folder into Odoo")
+    parser.add_argument("directory", nargs="?", default=Config.WATCH_DIR, help="Directory to watch (WATCH_DIR)")
+    parser.add_argument("--interval", type=float, default=None, help="Polling interval in seconds (WATCH_INTERVAL)")
+    parser.add_argument("--state-file", default=Config.WATCH_STATE_FILE or None, help="Where to keep ingestion state")
+    parser.add_argument("--once", action="store_true", help="Process the folder once and exit")
+    parser.add_argument("--tenants", action="store_true",
+                        help="Watch the watch_dir of every tenant in TENANTS_FILE and sync them concurrently")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=Config.LOG_LEVEL, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.tenants:
+        registry = TenantRegistry.load()
+        if not registry:
+            parser.error("--tenants needs TENANTS_FILE to list at least one tenant")
+        run_tenant_watch(registry, args.interval, once=args.once)
+        return 0
+    if not args.directory:
+        parser.error("no directory given and WATCH_DIR is not set")
+
+    run_watch(args.directory, args.interval, args.state_file, once=args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
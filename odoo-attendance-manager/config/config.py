@@ -16,3 +16,90 @@ class Config:
     ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    # Profiling is on when PROFILING is set or in DEBUG mode
+    PROFILING = os.getenv('PROFILING', str(DEBUG)).lower() == 'true'
+    PROFILE_HISTORY = int(os.getenv('PROFILE_HISTORY', '20'))
+    PROFILE_TOP_FUNCTIONS = int(os.getenv('PROFILE_TOP_FUNCTIONS', '40'))
+
+    # Startup
+    COLD_START_BUDGET_MS = int(os.getenv('COLD_START_BUDGET_MS', '1500'))
+
+    # Shift Schedule
+    SHIFT_START = os.getenv('SHIFT_START', '09:00')
+    SHIFT_END = os.getenv('SHIFT_END', '17:00')
+    LATE_GRACE_MINUTES = int(os.getenv('LATE_GRACE_MINUTES', '0'))
+    EARLY_GRACE_MINUTES = int(os.getenv('EARLY_GRACE_MINUTES', '0'))
+    # Working days of the default shift, 0 = Monday
+    SHIFT_WORKDAYS = os.getenv('SHIFT_WORKDAYS', '0,1,2,3,4')
+    # JSON file with named shifts and per-employee assignments (see readme)
+    SHIFTS_FILE = os.getenv('SHIFTS_FILE', '')
+    # Holiday calendar: one YYYY-MM-DD date per line (or a CSV with a date column)
+    HOLIDAYS_FILE = os.getenv('HOLIDAYS_FILE', '')
+
+    # Overtime & Payroll
+    # Regular hours per week before the rest counts as overtime; 0 disables the weekly cap
+    WEEKLY_REGULAR_HOURS = float(os.getenv('WEEKLY_REGULAR_HOURS', '40'))
+    # weekly, biweekly, semimonthly or monthly
+    PAY_PERIOD = os.getenv('PAY_PERIOD', 'monthly')
+    # First day of any biweekly pay period
+    PAY_PERIOD_ANCHOR = os.getenv('PAY_PERIOD_ANCHOR', '2024-01-01')
+
+    # Export
+    EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '50000'))
+
+    # Employee Provisioning
+    EMPLOYEE_BATCH_SIZE = int(os.getenv('EMPLOYEE_BATCH_SIZE', '100'))
+
+    # Charts
+    CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '500'))
+
+    # Progress Reporting
+    PROGRESS_MIN_INTERVAL = float(os.getenv('PROGRESS_MIN_INTERVAL', '0.25'))
+    PROGRESS_MIN_STEP = float(os.getenv('PROGRESS_MIN_STEP', '0.01'))
+
+    # Import
+    DEFAULT_ATTENDANCE_FILE = os.getenv('DEFAULT_ATTENDANCE_FILE', '/home/sabry/yarab/data/acnLog12.xls')
+    # Explicit strptime format of the Time column (e.g. %Y-%m-%d %H:%M:%S); inferred when empty
+    PUNCH_TIME_FORMAT = os.getenv('PUNCH_TIME_FORMAT', '')
+
+    # Watched Folder Ingestion
+    WATCH_DIR = os.getenv('WATCH_DIR', '')
+    WATCH_PATTERNS = os.getenv('WATCH_PATTERNS', '*.xls,*.xlsx,*.csv,*.parquet,*.arrow,*.feather')
+    WATCH_INTERVAL = float(os.getenv('WATCH_INTERVAL', '10'))
+    WATCH_STATE_FILE = os.getenv('WATCH_STATE_FILE', '')
+    WATCH_RETENTION_DAYS = int(os.getenv('WATCH_RETENTION_DAYS', '7'))
+    UPLOAD_BATCH_SIZE = int(os.getenv('UPLOAD_BATCH_SIZE', '200'))
+
+    # Local Attendance Store
+    ATTENDANCE_DB = os.getenv('ATTENDANCE_DB', 'attendance.db')
+
+    # Punch Cleaning
+    PUNCH_DEBOUNCE_SECONDS = int(os.getenv('PUNCH_DEBOUNCE_SECONDS', '60'))
+
+    # Multi-Tenant Sync
+    # JSON list of tenants: name, url, db, username, password or password_env,
+    # plus optional api_key, rate_limit (requests/s), pool_size, watch_dir, attendance_db
+    TENANTS_FILE = os.getenv('TENANTS_FILE', '')
+    TENANT_WORKERS = int(os.getenv('TENANT_WORKERS', '4'))
+    TENANT_RATE_LIMIT = float(os.getenv('TENANT_RATE_LIMIT', '10'))
+    TENANT_POOL_SIZE = int(os.getenv('TENANT_POOL_SIZE', '4'))
+
+    # Reconciliation
+    ODOO_PULL_PAGE_SIZE = int(os.getenv('ODOO_PULL_PAGE_SIZE', '500'))
+    # Differences up to this many seconds between device and Odoo times count as a match
+    RECONCILE_TOLERANCE_SECONDS = int(os.getenv('RECONCILE_TOLERANCE_SECONDS', '60'))
+
+    # Odoo Session Reuse
+    # Encrypted on-disk session cache; sessions stay in memory only when unset
+    SESSION_CACHE_FILE = os.getenv('SESSION_CACHE_FILE', '')
+    # Fernet key (cryptography.fernet.Fernet.generate_key()) used to encrypt SESSION_CACHE_FILE
+    SESSION_CACHE_KEY = os.getenv('SESSION_CACHE_KEY', '')
+    # A session idle for longer than this is re-validated before the next call
+    SESSION_KEEPALIVE_SECONDS = int(os.getenv('SESSION_KEEPALIVE_SECONDS', '300'))
+
+    # Odoo Wire Format
+    # IANA timezone of the terminals' local times (e.g. Africa/Cairo); the system timezone when empty
+    TIMEZONE = os.getenv('TIMEZONE', '')
+    # Gzip request bodies; only for servers (or proxies) that accept Content-Encoding: gzip
+    ODOO_GZIP_REQUESTS = os.getenv('ODOO_GZIP_REQUESTS', 'False').lower() == 'true'
+    ODOO_GZIP_MIN_BYTES = int(os.getenv('ODOO_GZIP_MIN_BYTES', '1024'))
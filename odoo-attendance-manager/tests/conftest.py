@@ -0,0 +1,86 @@
+import os
+import sys
+
+import pytest
+
+# Make the app and config packages importable, as run.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.odoo_api import OdooAPI, OdooError
+
+
+class FakeOdoo:
+    """Creates attendances in memory and rejects those of one employee
+
+    Set ``offline`` to make every call fail the way an unreachable server does.
+    ``attendance`` holds the hr.attendance rows served to incremental pulls;
+    an employee's badge is their Odoo ID as a string.
+    """
+
+    def __init__(self, rejected_employee=None):
+        self.rejected_employee = rejected_employee
+        self.offline = False
+        self.created = []
+        self.updated = []
+        self.attendance = []
+        self.pulled = []
+
+    def _check_online(self):
+        if self.offline:
+            raise Exception("Error creating attendances: Connection error")
+
+    def get_employee_ids(self, badge_ids):
+        return {badge_id: int(badge_id) for badge_id in badge_ids}
+
+    def create_attendance_values(self, values):
+        self._check_online()
+        if any(value["employee_id"] == self.rejected_employee for value in values):
+            raise OdooError("Error creating attendances: Cannot create new attendance record")
+        self.created.extend(values)
+        return list(range(len(self.created) - len(values) + 1, len(self.created) + 1))
+
+    create_attendance_values_each = OdooAPI.create_attendance_values_each
+
+    def update_attendance(self, attendance_id, check_in=None, check_out=None):
+        self._check_online()
+        self.updated.append((attendance_id, check_in, check_out))
+        return True
+
+    def write_attendance(self, attendance_id, employee_id, check_in, check_out, write_date):
+        """Create or edit an hr.attendance row; times are Odoo UTC strings"""
+        self.attendance = [row for row in self.attendance if row["id"] != attendance_id] + [{
+            "id": attendance_id,
+            "employee_id": [employee_id, f"Employee {employee_id}"],
+            "check_in": check_in,
+            "check_out": check_out,
+            "worked_hours": 0.0,
+            "write_date": write_date,
+        }]
+
+    def _changed(self, since=None, until=None):
+        return sorted(
+            (row for row in self.attendance
+             if (not since or row["write_date"] >= since) and (not until or row["write_date"] <= until)),
+            key=lambda row: row["id"]
+        )
+
+    def get_latest_attendance_write_date(self):
+        return max((row["write_date"] for row in self.attendance), default=None)
+
+    def count_attendance(self, domain=None):
+        bounds = {operator: value for _, operator, value in domain or []}
+        return len(self._changed(bounds.get(">="), bounds.get("<=")))
+
+    def iter_changed_attendance(self, since=None, until=None, page_size=500):
+        rows = self._changed(since, until)
+        self.pulled.extend(row["id"] for row in rows)
+        for start in range(0, len(rows), page_size):
+            yield rows[start:start + page_size]
+
+    def get_employee_barcodes(self, employee_ids):
+        return {employee_id: str(employee_id) for employee_id in employee_ids}
+
+
+@pytest.fixture
+def fake_odoo():
+    return FakeOdoo
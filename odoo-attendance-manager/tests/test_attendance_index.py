@@ -0,0 +1,89 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.attendance_index import AttendanceIndex
+
+
+def _attendance():
+    rng = np.random.default_rng(7)
+    days = pd.date_range("2024-01-01", "2024-02-29").date
+    rows = 400
+    return pd.DataFrame({
+        "employee_id": rng.choice(["1", "2", "10", "33", "7"], rows),
+        "date": rng.choice(days, rows),
+        "total_hours": rng.uniform(4, 10, rows).round(2),
+    })
+
+
+def _mask_filter(df, employees=None, start=None, end=None):
+    mask = pd.Series(True, index=df.index)
+    if employees:
+        mask &= df["employee_id"].astype(str).isin([str(employee) for employee in employees])
+    if start is not None:
+        mask &= df["date"] >= start
+    if end is not None:
+        mask &= df["date"] <= end
+    matched = df[mask]
+    matched = matched.assign(_employee=matched["employee_id"].astype(str))
+    return matched.sort_values(["_employee", "date"], kind="stable").drop(columns="_employee").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("employees, start, end", [
+    (None, None, None),
+    (["2"], None, None),
+    (["10", "7"], None, None),
+    ([1, 33], None, None),
+    (None, date(2024, 1, 15), None),
+    (None, None, date(2024, 1, 15)),
+    (None, date(2024, 1, 15), date(2024, 1, 15)),
+    (["1"], date(2024, 1, 10), date(2024, 2, 10)),
+    (["2", "33"], date(2024, 2, 1), date(2024, 2, 29)),
+    (None, date(2023, 12, 1), date(2024, 1, 1)),
+    (None, date(2024, 2, 29), date(2024, 3, 31)),
+    (["404"], None, None),
+    (["1", "404"], date(2024, 1, 1), date(2024, 1, 31)),
+    (None, date(2024, 2, 10), date(2024, 2, 1)),
+    (None, "2024-01-20", "2024-01-25"),
+])
+def test_filter_matches_a_boolean_mask(employees, start, end):
+    attendance = _attendance()
+    index = AttendanceIndex(attendance)
+
+    expected = _mask_filter(attendance, employees, start and pd.Timestamp(start).date(), end and pd.Timestamp(end).date())
+    pd.testing.assert_frame_equal(index.filter(employees, start, end).df, expected)
+
+
+def test_bounds_on_existing_rows_are_inclusive():
+    attendance = _attendance()
+    index = AttendanceIndex(attendance)
+    rows = index.employee_frame("10")
+    first, last = rows["date"].iloc[0], rows["date"].iloc[-1]
+
+    filtered = index.filter(["10"], first, last)
+
+    assert len(filtered) == len(rows)
+    assert filtered.date_min == first
+    assert filtered.date_max == last
+
+
+def test_filters_compose():
+    attendance = _attendance()
+    index = AttendanceIndex(attendance)
+
+    nested = index.filter(start=date(2024, 1, 10)).filter(["1", "2"], end=date(2024, 2, 5))
+
+    expected = _mask_filter(attendance, ["1", "2"], date(2024, 1, 10), date(2024, 2, 5))
+    pd.testing.assert_frame_equal(nested.df, expected)
+    assert nested.is_for(attendance)
+    assert nested.employees == ["1", "2"]
+
+
+def test_empty_attendance():
+    index = AttendanceIndex(_attendance().iloc[:0])
+
+    assert index.empty
+    assert index.date_min is None
+    assert len(index.filter(["1"], date(2024, 1, 1), date(2024, 1, 31))) == 0
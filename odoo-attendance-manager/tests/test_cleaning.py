@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+
+from app.utils.cleaning import clean_punches, debounce_punches
+from app.utils.data_processor import pair_punches
+from app.utils.readers import read_punch_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "acnLog12.xls")
+
+
+def _punches(state, times):
+    df = pd.DataFrame({"AC-No.": "1", "State": state, "Time": pd.to_datetime(times)})
+    df["Date"] = df["Time"].dt.date
+    return df
+
+
+def test_debounce_keeps_latest_check_out():
+    punches = _punches("C/Out", ["2024-01-01 17:00:00", "2024-01-01 17:00:30"])
+    kept, exceptions = debounce_punches(punches, 60)
+    assert kept["Time"].tolist() == [pd.Timestamp("2024-01-01 17:00:30")]
+    assert exceptions["Time"].tolist() == [pd.Timestamp("2024-01-01 17:00:00")]
+
+
+def test_debounce_measures_from_kept_punch():
+    punches = _punches("C/In", ["2024-01-01 08:00:00", "2024-01-01 08:00:50", "2024-01-01 08:01:40"])
+    kept, _ = debounce_punches(punches, 60)
+    assert kept["Time"].tolist() == [pd.Timestamp("2024-01-01 08:00:00"), pd.Timestamp("2024-01-01 08:01:40")]
+
+
+def test_cleaning_sample_file_keeps_paired_hours():
+    punches = read_punch_file(SAMPLE_FILE)
+    clean, _ = clean_punches(punches)
+    baseline = pair_punches(punches)
+    cleaned = pair_punches(clean)
+
+    merged = baseline.merge(cleaned, on=["employee_id", "date"], suffixes=("_baseline", "_clean"))
+    assert len(merged) == len(baseline)
+    assert (merged["check_in_baseline"] == merged["check_in_clean"]).all()
+    assert (merged["check_out_baseline"] == merged["check_out_clean"]).all()
+
+    day = cleaned[(cleaned["employee_id"] == "201") & (cleaned["date"].astype(str) == "2024-11-27")]
+    assert day["check_out"].tolist() == [pd.Timestamp("2024-11-27 13:02:00")]
+    assert day["total_hours"].round(2).tolist() == [5.5]
@@ -0,0 +1,175 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from app.utils.odoo_api import OdooAPI, OdooError
+from app.utils.session_cache import SessionCache
+
+
+class FakeServer:
+    """Answers an OdooAPI's JSON-RPC posts in memory and records the paths called
+
+    Attendance creates for ``rejected_employee`` fail with a JSON-RPC error, as
+    an Odoo constraint would; while ``down`` every post raises a connection error.
+    Logins succeed for ``passwords`` and open a new session each time.
+    """
+
+    def __init__(self, rejected_employee=None):
+        self.rejected_employee = rejected_employee
+        self.down = False
+        self.passwords = {"secret"}
+        self.sessions = set()
+        self.calls = []
+        self.created = []
+
+    def connect(self, api):
+        api.session.post = lambda url, data, headers: self.post(api, url, data)
+        return api
+
+    @staticmethod
+    def _response(payload):
+        return SimpleNamespace(content=json.dumps(payload).encode(), status_code=200)
+
+    def post(self, api, url, data):
+        path = url[len(api.url):]
+        self.calls.append(path)
+        if self.down:
+            raise requests.exceptions.ConnectionError("Connection refused")
+        params = json.loads(data)["params"]
+        if path == "/web/session/authenticate":
+            if params["password"] not in self.passwords:
+                return self._response({"error": {"code": 200, "data": {"message": "Access Denied"}}})
+            session_id = f"session-{len(self.sessions) + 1}"
+            self.sessions.add(session_id)
+            api.session.cookies.set("session_id", session_id)
+            return self._response({"result": {"uid": 2}})
+        if api._session_cookie() not in self.sessions:
+            return self._response({"error": {"code": 100, "data": {
+                "name": "odoo.http.SessionExpiredException", "message": "Session expired"}}})
+        if path == "/web/session/get_session_info":
+            return self._response({"result": {"uid": 2, "db": api.db}})
+        values = params["args"][0]
+        if any(value["employee_id"] == self.rejected_employee for value in values):
+            return self._response({"error": {"code": 200, "data": {"message": "Cannot create new attendance record"}}})
+        self.created.extend(values)
+        return self._response({"result": list(range(len(self.created) - len(values) + 1, len(self.created) + 1))})
+
+
+def _odoo(server, cache=None, url="https://odoo.example", password="secret"):
+    return server.connect(OdooAPI(url, "db", "admin", password, session_cache=cache or SessionCache()))
+
+
+def _values(*employee_ids):
+    return [{"employee_id": employee_id, "check_in": "2024-01-01 08:00:00", "check_out": False}
+            for employee_id in employee_ids]
+
+
+def test_rejected_batch_falls_back_to_one_create_per_record():
+    server = FakeServer(rejected_employee=2)
+    odoo = _odoo(server)
+
+    results = odoo.create_attendance_values_each(_values(1, 2, 3))
+
+    assert [attendance_id for attendance_id, _ in results] == [1, None, 2]
+    assert "Cannot create new attendance record" in results[1][1]
+    assert server.calls.count("/web/dataset/call_kw") == 4
+
+
+def test_json_rpc_errors_raise_odoo_error():
+    odoo = _odoo(FakeServer(rejected_employee=1))
+
+    with pytest.raises(OdooError, match="Error creating attendances: Cannot create"):
+        odoo.create_attendance_values(_values(1))
+
+
+def test_connection_errors_are_not_retried_per_record():
+    server = FakeServer()
+    odoo = _odoo(server)
+    odoo.ensure_session()
+    server.calls.clear()
+    server.down = True
+
+    with pytest.raises(Exception, match="Connection refused") as excinfo:
+        odoo.create_attendance_values_each(_values(1, 2, 3))
+
+    assert not isinstance(excinfo.value, OdooError)
+    assert server.calls == ["/web/dataset/call_kw"]
+
+
+@pytest.fixture(params=["memory", "disk"])
+def session_caches(request, tmp_path):
+    """Factory of caches sharing their sessions: one in-memory cache, or
+    Fernet-encrypted files read afresh each time, as after a restart"""
+    if request.param == "memory":
+        cache = SessionCache()
+        return lambda: cache
+    fernet = pytest.importorskip("cryptography.fernet")
+    path, key = str(tmp_path / "sessions.bin"), fernet.Fernet.generate_key()
+    return lambda: SessionCache(path, key)
+
+
+def test_second_client_reuses_the_cached_session(session_caches):
+    server = FakeServer()
+    _odoo(server, session_caches()).ensure_session()
+    server.calls.clear()
+
+    odoo = _odoo(server, session_caches())
+    assert odoo.ensure_session() == 2
+
+    assert server.calls == ["/web/session/get_session_info"]
+    assert odoo._session_cookie() == "session-1"
+
+
+def test_cached_session_is_tied_to_password_and_url(session_caches):
+    server = FakeServer()
+    _odoo(server, session_caches()).ensure_session()
+
+    server.calls.clear()
+    with pytest.raises(Exception, match="Access Denied"):
+        _odoo(server, session_caches(), password="wrong").ensure_session()
+    assert server.calls == ["/web/session/authenticate"]
+
+    server.calls.clear()
+    server.passwords.add("rotated")
+    odoo = _odoo(server, session_caches(), password="rotated")
+    odoo.ensure_session()
+    assert server.calls == ["/web/session/authenticate"]
+    assert odoo._session_cookie() == "session-2"
+
+    server.calls.clear()
+    odoo = _odoo(server, session_caches(), url="https://other.example")
+    odoo.ensure_session()
+    assert server.calls == ["/web/session/authenticate"]
+    assert odoo._session_cookie() == "session-3"
+
+
+def test_expired_session_logs_in_again(session_caches):
+    server = FakeServer()
+    _odoo(server, session_caches()).ensure_session()
+    server.sessions.clear()
+    server.calls.clear()
+
+    odoo = _odoo(server, session_caches())
+    odoo.ensure_session()
+
+    assert server.calls == ["/web/session/get_session_info", "/web/session/authenticate"]
+    assert odoo._session_cookie() == "session-1"
+    assert session_caches().get(odoo.url, odoo.db, odoo.username, odoo._secret)["session_id"] == "session-1"
+
+
+def test_session_expiring_mid_call_is_renewed():
+    server = FakeServer()
+    odoo = _odoo(server)
+    odoo.ensure_session()
+    server.sessions.clear()
+    server.calls.clear()
+
+    assert odoo.create_attendance_values(_values(1)) == [1]
+    assert server.calls == [
+        "/web/dataset/call_kw",
+        "/web/session/get_session_info",
+        "/web/session/authenticate",
+        "/web/dataset/call_kw",
+    ]
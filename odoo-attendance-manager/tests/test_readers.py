@@ -0,0 +1,61 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from app.utils.readers import read_punch_file, sniff_format
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "acnLog12.xls")
+
+PUNCHES = pd.DataFrame({
+    "AC-No.": ["1", "2"],
+    "Time": pd.to_datetime(["2024-01-01 08:00:00", "2024-01-01 17:00:00"]),
+    "State": ["C/In", "C/Out"],
+})
+
+
+def _write(path, fmt):
+    if fmt == "csv":
+        PUNCHES.to_csv(path, index=False)
+    elif fmt == "xlsx":
+        PUNCHES.to_excel(path, index=False, engine="openpyxl")
+    else:
+        shutil.copy(SAMPLE_FILE, path)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "xlsx", "xls"])
+@pytest.mark.parametrize("extension", [".csv", ".xlsx", ".xls", ".dat"])
+def test_format_is_sniffed_from_contents_not_extension(tmp_path, fmt, extension):
+    path = tmp_path / f"export{extension}"
+    _write(path, fmt)
+
+    assert sniff_format(str(path)) == fmt
+    with open(path, "rb") as f:
+        assert sniff_format(f) == fmt
+        assert f.tell() == 0
+
+    punches = read_punch_file(str(path))
+    assert list(punches.columns) == ["AC-No.", "Time", "State", "Date"]
+    assert pd.api.types.is_datetime64_any_dtype(punches["Time"])
+    if fmt != "xls":
+        assert punches["AC-No."].tolist() == ["1", "2"]
+        assert punches["State"].astype(str).tolist() == ["C/In", "C/Out"]
+
+
+def test_csv_with_padded_headers(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("AC-No., Time, State\n1,2024-01-01 08:00:00,C/In\n1,2024-01-01 17:00:00,C/Out\n")
+
+    punches = read_punch_file(str(path))
+
+    assert punches["Time"].tolist() == list(PUNCHES["Time"])
+    assert punches["State"].astype(str).tolist() == ["C/In", "C/Out"]
+
+
+def test_csv_missing_a_column(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("AC-No.;Time\n1;2024-01-01 08:00:00\n")
+
+    with pytest.raises(Exception, match="Missing required columns: State"):
+        read_punch_file(str(path))
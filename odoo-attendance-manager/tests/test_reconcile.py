@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+from app.utils.progress import NullProgressSink
+from app.utils.readers import read_punch_file
+from app.utils.reconcile import WATERMARK_KEY, pull_odoo_changes, reconcile
+from app.utils.store import AttendanceStore
+from config import Config
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TIMEZONE", "Europe/Paris")
+    store = AttendanceStore(str(tmp_path / "attendance.db"))
+    # Device punches in local time (UTC+1 in January)
+    store.import_punches(read_punch_file(io.BytesIO(b"""AC-No.,Time,State
+1,2024-01-08 08:00:00,C/In
+1,2024-01-08 17:00:00,C/Out
+2,2024-01-08 08:00:00,C/In
+2,2024-01-08 17:00:00,C/Out
+4,2024-01-08 08:00:00,C/In
+4,2024-01-08 17:00:00,C/Out
+""")))
+    return store
+
+
+@pytest.fixture
+def odoo(fake_odoo):
+    odoo = fake_odoo()
+    odoo.write_attendance(10, 1, "2024-01-08 07:00:30", "2024-01-08 16:00:00", "2024-01-09 10:00:00")
+    odoo.write_attendance(11, 3, "2024-01-08 07:00:00", "2024-01-08 16:00:00", "2024-01-09 10:05:00")
+    odoo.write_attendance(12, 4, "2024-01-08 07:00:00", "2024-01-08 14:00:00", "2024-01-09 10:10:00")
+    return odoo
+
+
+def _statuses(store):
+    diff = reconcile(store, tolerance_seconds=60)
+    return dict(zip(diff["employee_id"], diff["status"]))
+
+
+def test_reconcile_statuses(store, odoo):
+    assert pull_odoo_changes(odoo, store, progress=NullProgressSink()) == 3
+
+    assert _statuses(store) == {
+        "1": "match",
+        "2": "missing_in_odoo",
+        "3": "only_in_odoo",
+        "4": "changed_in_odoo",
+    }
+    diff = reconcile(store).set_index("employee_id")
+    assert diff.loc["4", "check_out_delta_min"] == -120.0
+
+
+def test_incremental_pull_reads_only_changed_rows(store, odoo):
+    pull_odoo_changes(odoo, store, progress=NullProgressSink())
+    assert store.get_sync_value(WATERMARK_KEY) == "2024-01-09 10:10:00"
+
+    odoo.pulled.clear()
+    odoo.write_attendance(12, 4, "2024-01-08 07:00:00", "2024-01-08 16:00:00", "2024-01-09 11:00:00")
+    assert pull_odoo_changes(odoo, store, progress=NullProgressSink()) == 1
+
+    assert odoo.pulled == [12]
+    assert store.get_sync_value(WATERMARK_KEY) == "2024-01-09 11:00:00"
+    assert _statuses(store)["4"] == "match"
+
+    # The watermark is inclusive, so only the row written at it is read again
+    odoo.pulled.clear()
+    pull_odoo_changes(odoo, store, progress=NullProgressSink())
+    assert odoo.pulled == [12]
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from app.utils.cleaning import clean_punches
+from app.utils.data_processor import pair_punches
+from app.utils.rules import apply_rules, assign_shift_dates, load_shift_schedule
+
+
+def _punches(rows):
+    df = pd.DataFrame(rows, columns=["AC-No.", "Time", "State"])
+    df["Time"] = pd.to_datetime(df["Time"])
+    df["State"] = df["State"].astype("category")
+    df["Date"] = df["Time"].dt.date
+    return df
+
+
+def test_overnight_shift_punches_pair(tmp_path):
+    schedule = tmp_path / "shifts.json"
+    schedule.write_text('{"shifts": {"night": {"start": "22:00", "end": "06:00"}}, "employees": {"1001": "night"}}')
+    shifts, assignments = load_shift_schedule(str(schedule))
+
+    punches = assign_shift_dates(_punches([
+        ("1001", "2024-01-01 21:55:00", "C/In"),
+        ("1001", "2024-01-02 06:05:00", "C/Out"),
+        ("1002", "2024-01-02 09:00:00", "C/In"),
+        ("1002", "2024-01-02 17:00:00", "C/Out"),
+    ]), shifts, assignments)
+    clean, exceptions = clean_punches(punches)
+    attendance = pair_punches(clean)
+
+    assert exceptions.empty
+    night = attendance[attendance["employee_id"] == "1001"].iloc[0]
+    assert str(night["date"]) == "2024-01-01"
+    assert night["total_hours"] == 8 + 10 / 60
+
+    rules = apply_rules(attendance, shifts, assignments, holidays=[], weekly_regular_hours=0)
+    night = rules[rules["employee_id"] == "1001"].iloc[0]
+    assert night["late_minutes"] == 0 and night["early_minutes"] == 0
+    assert night["regular_hours"] == 8
+    day = rules[rules["employee_id"] == "1002"].iloc[0]
+    assert str(day["date"]) == "2024-01-02"
@@ -0,0 +1,15 @@
+from app.utils.startup import check_cold_start
+
+
+def test_app_main_passes_the_cold_start_check():
+    report, problems = check_cold_start("app.main")
+
+    assert report["heavy_modules"] == []
+    assert problems == []
+
+
+def test_eager_heavy_imports_are_reported():
+    report, problems = check_cold_start("app.utils.readers")
+
+    assert "pandas" in report["heavy_modules"]
+    assert problems
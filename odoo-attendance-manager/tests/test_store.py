@@ -0,0 +1,61 @@
+import io
+
+import pandas as pd
+
+from app.utils.readers import read_punch_file
+from app.utils.store import AttendanceStore
+
+
+def _punches(*lines):
+    return read_punch_file(io.BytesIO(("AC-No.,Time,State\n" + "\n".join(lines) + "\n").encode()))
+
+
+MORNING = _punches(
+    "1,2024-01-01 08:00:00,C/In",
+    "2,2024-01-01 09:00:00,C/In",
+    "2,2024-01-01 17:00:00,C/Out",
+)
+AFTERNOON = _punches(
+    "1,2024-01-01 12:00:00,C/Out",
+    "1,2024-01-01 13:00:00,C/In",
+    "1,2024-01-01 17:30:00,C/Out",
+)
+
+
+def test_reimporting_an_export_inserts_nothing(tmp_path):
+    store = AttendanceStore(str(tmp_path / "attendance.db"))
+
+    assert store.import_punches(MORNING, source="morning.csv") == 3
+    first = store.query_attendance()
+    assert store.import_punches(MORNING, source="morning.csv") == 0
+
+    pd.testing.assert_frame_equal(store.query_attendance(), first)
+    assert len(first) == 1
+
+
+def test_day_split_across_exports_is_repaired(tmp_path):
+    store = AttendanceStore(str(tmp_path / "attendance.db"))
+
+    store.import_punches(MORNING, source="morning.csv")
+    # Employee 1 has no C/Out yet, so only employee 2 is paired
+    assert store.query_attendance()["employee_id"].tolist() == ["2"]
+
+    assert store.import_punches(AFTERNOON, source="afternoon.csv") == 3
+    attendance = store.query_attendance(employees=["1"])
+
+    assert len(attendance) == 1
+    day = attendance.iloc[0]
+    assert day["check_in"] == pd.Timestamp("2024-01-01 08:00:00")
+    assert day["check_out"] == pd.Timestamp("2024-01-01 17:30:00")
+    assert day["total_hours"] == 9.5
+
+
+def test_later_export_extends_a_paired_day(tmp_path):
+    store = AttendanceStore(str(tmp_path / "attendance.db"))
+    store.import_punches(_punches("1,2024-01-01 08:00:00,C/In", "1,2024-01-01 12:00:00,C/Out"))
+
+    store.import_punches(_punches("1,2024-01-01 18:00:00,C/Out"))
+
+    day = store.query_attendance().iloc[0]
+    assert day["check_out"] == pd.Timestamp("2024-01-01 18:00:00")
+    assert day["total_hours"] == 10.0
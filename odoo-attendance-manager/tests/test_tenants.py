@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pandas as pd
+
+from app.utils.tenants import MultiTenantSync, Tenant
+
+
+def test_attendance_jobs_are_uploaded_per_tenant(fake_odoo):
+    tenant = Tenant("Acme", "https://acme.example", "acme", "sync", "secret", rate_limit=0)
+    tenant._odoo = fake_odoo(rejected_employee=2)
+    attendance = pd.DataFrame({
+        "employee_id": ["1", "2", "1"],
+        "check_in": pd.to_datetime(["2024-01-01 08:00", "2024-01-01 08:00", "2024-01-02 08:00"]),
+        "check_out": pd.to_datetime(["2024-01-01 17:00", "2024-01-01 17:00", "2024-01-02 17:00"]),
+    })
+
+    jobs, unknown = tenant.attendance_jobs(attendance, batch_size=10)
+    result = MultiTenantSync({tenant: jobs}).run()["Acme"]
+
+    assert unknown == []
+    assert result["created"] == 2
+    assert result["rejected"] == 1
+    assert result["failed"] == 0
+
+
+def test_outage_stops_the_tenant_and_defers_its_jobs(fake_odoo):
+    tenant = Tenant("Acme", "https://acme.example", "acme", "sync", "secret", rate_limit=0)
+    tenant._odoo = fake_odoo()
+    tenant._odoo.offline = True
+    attendance = pd.DataFrame({
+        "employee_id": [str(employee) for employee in range(1, 31)],
+        "check_in": pd.Timestamp("2024-01-01 08:00"),
+        "check_out": pd.Timestamp("2024-01-01 17:00"),
+    })
+
+    jobs, _ = tenant.attendance_jobs(attendance, batch_size=10)
+    result = MultiTenantSync({tenant: jobs}).run()["Acme"]
+
+    assert result["jobs"] == 1
+    assert result["failed"] == 1
+    assert result["deferred"] == 2
+    assert result.get("rejected", 0) == 0
+
+
+def test_concurrent_runs_keep_their_own_jobs_and_one_request_in_flight():
+    tenant = Tenant("Acme", "https://acme.example", "acme", "sync", "secret", rate_limit=0)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return {"created": 1}
+
+    results = {}
+
+    def upload(name, count):
+        results[name] = MultiTenantSync({tenant: [job] * count}).run()["Acme"]
+
+    threads = [threading.Thread(target=upload, args=(name, count)) for name, count in (("a", 5), ("b", 8))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["a"]["created"] == 5
+    assert results["b"]["created"] == 8
+    assert results["a"]["failed"] == results["b"]["failed"] == 0
+    assert peak[0] == 1
@@ -0,0 +1,18 @@
+import pandas as pd
+
+from app.utils.timezones import to_local_strings, to_utc_string, to_utc_strings
+
+
+def test_midnight_values_keep_their_time():
+    values = pd.to_datetime(["2024-01-01 00:00", "2024-01-02 00:00"])
+    assert to_utc_strings(values, "UTC").tolist() == ["2024-01-01 00:00:00", "2024-01-02 00:00:00"]
+    assert to_utc_string("2024-03-01 00:00:00", "UTC") == "2024-03-01 00:00:00"
+
+
+def test_local_times_are_sent_as_utc():
+    values = pd.Series([pd.Timestamp("2024-06-01 08:00:30.7"), pd.NaT])
+    assert to_utc_strings(values, "Africa/Cairo").tolist() == ["2024-06-01 05:00:30", False]
+
+
+def test_odoo_times_are_read_as_local():
+    assert to_local_strings(["2024-01-01 06:00:00", False], "Africa/Cairo").tolist() == ["2024-01-01 08:00:00", None]
@@ -0,0 +1,78 @@
+import pandas as pd
+
+from app.utils.watcher import WatchIngestor
+
+
+def _punches(employees, days):
+    rows = []
+    for employee in employees:
+        for day in pd.date_range("2024-01-01", periods=days):
+            rows.append((employee, day + pd.Timedelta(hours=8), "C/In"))
+            rows.append((employee, day + pd.Timedelta(hours=17), "C/Out"))
+    df = pd.DataFrame(rows, columns=["AC-No.", "Time", "State"])
+    df["Date"] = df["Time"].dt.date
+    return df
+
+
+def test_sync_isolates_rejected_records(tmp_path, fake_odoo):
+    odoo = fake_odoo(rejected_employee=3)
+    ingestor = WatchIngestor(odoo, str(tmp_path / "state.json"), batch_size=50, retention_days=10000)
+    ingestor.merge_punches(_punches(["1", "2", "3", "4", "5"], 38))
+
+    result = ingestor.sync()
+    assert result["created"] == 152
+    assert result["rejected"] == 38
+    assert len(odoo.created) == 152
+
+    # Rejected days are not retried until their punches change
+    assert ingestor.sync()["rejected"] == 0
+
+
+def test_outage_leaves_days_pending(tmp_path, fake_odoo):
+    odoo = fake_odoo()
+    ingestor = WatchIngestor(odoo, str(tmp_path / "state.json"), batch_size=50, retention_days=10000)
+    ingestor.merge_punches(_punches(["1", "2"], 30))
+
+    odoo.offline = True
+    result = ingestor.sync()
+    assert result["created"] == 0
+    assert result["deferred"] == 2
+    assert not any(day["error"] for day in ingestor.state["days"].values())
+
+    odoo.offline = False
+    result = ingestor.sync()
+    assert result["created"] == 60
+    assert not ingestor.has_unsynced_days()
+
+
+def test_update_outage_is_not_a_rejection(tmp_path, fake_odoo):
+    odoo = fake_odoo()
+    ingestor = WatchIngestor(odoo, str(tmp_path / "state.json"), retention_days=10000)
+    ingestor.merge_punches(_punches(["1"], 1))
+    ingestor.sync()
+    late = _punches(["1"], 1)
+    late["Time"] += pd.Timedelta(hours=1)
+    ingestor.merge_punches(late)
+
+    odoo.offline = True
+    assert ingestor.sync()["deferred"] == 1
+    odoo.offline = False
+    assert ingestor.sync()["updated"] == 1
+    assert ingestor.state["days"]["1|2024-01-01"]["check_out"] == "2024-01-01T18:00:00"
+
+
+def test_ingest_reads_only_appended_csv_lines(tmp_path, fake_odoo):
+    export = tmp_path / "punches.csv"
+    export.write_text("AC-No.,Time,State\n1,2024-01-01 08:00:00,C/In\n1,2024-01-01 17:00:00,C/")
+    ingestor = WatchIngestor(fake_odoo(), str(tmp_path / "state.json"), retention_days=10000)
+
+    # The unfinished last line is left for the next read
+    assert ingestor.ingest_file(str(export)) == 1
+    offset = ingestor.state["files"][str(export)]["offset"]
+    assert offset == len("AC-No.,Time,State\n1,2024-01-01 08:00:00,C/In\n")
+
+    with open(export, "a") as f:
+        f.write("Out\n2,2024-01-01 09:00:00,C/In\n")
+    assert ingestor.ingest_file(str(export)) == 2
+    assert ingestor.state["days"]["1|2024-01-01"]["check_out"] == "2024-01-01T17:00:00"
+    assert ingestor.state["files"][str(export)]["rows"] == 3
@@ -14,6 +14,8 @@ sys.path.insert(0, project_root)
 
 import streamlit as st
 from app.main import run_app
+from app.utils.profiling import profile_run
 
 if __name__ == "__main__":
-    run_app()
+    with profile_run("rerun"):
+        run_app()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+# Get the absolute path to the odoo-attendance-manager directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "odoo-attendance-manager")
+
+# Verify the path exists
+if not os.path.exists(project_root):
+    raise Exception(f"Project directory not found at: {project_root}")
+
+# Add to Python path
+sys.path.insert(0, project_root)
+
+from app.watch import main
+
+if __name__ == "__main__":
+    sys.exit(main())